@@ -1,5 +1,10 @@
 
 from .knx import KnxAddress, KnxBaseTelegram, KnxExtendedTelegram, KnxStandardTelegram, KnxAcknowledgementTelegram
 from .const import TelegramType, TelegramPriority, APCI, TPCI, TelegramAcknowledgement
-from .parser import parse_knx_telegram
-from .constructor import construct_payload
+from .parser import parse_knx_telegram, parse_knx_telegrams, parse_knx_stream, parse_knx_telegram_tolerant
+from .lazy import LazyKnxTelegram, parse_knx_telegram_lazy
+from .constructor import construct_payload, construct_telegram, serialize_many
+from .filters import compile_filter
+from .dpt import DptMapping, decode_dpt
+from .errors import FrameError, FrameErrorCollector
+from .cache import DecodeCache
@@ -0,0 +1,261 @@
+"""
+Incremental bus load and traffic statistics over streams of telegrams.
+
+All per address counters are fixed size arrays indexed by the raw 16 bit address (65536 entries each),
+per line counters are indexed by the upper byte of the source address. No `KnxAddress` objects are used
+as keys, so updating costs a few array increments per telegram.
+
+`BusLoadAnalyzer` keeps cumulative totals and the same counters over a sliding window. The window is split
+into buckets; the addresses seen in every bucket are remembered, so their counts can be decremented again
+once the bucket falls out of the window.
+"""
+import heapq
+from array import array
+from collections import deque
+from datetime import timedelta
+
+from .const import TelegramAcknowledgement, TelegramType
+from .knx import KnxAddress, datetime_to_ns
+
+ADDRESSES = 1 << 16
+LINES = 1 << 8
+
+DEFAULT_WINDOW = timedelta(minutes=1)
+DEFAULT_BUCKET = timedelta(seconds=1)
+
+ACKNOWLEDGEMENTS = ('ACK', 'NACK', 'BUSY', 'NACK_BUSY')
+PRIORITIES = ('SYSTEM', 'NORMAL', 'URGENT', 'LOW')  # in the order of their values
+
+
+class TrafficCounters(object):
+    """
+    Counters of one set of telegrams, either the totals or the sliding window
+    """
+
+    def __init__(self):
+        self.telegrams = 0
+        self.repeats = 0
+        self.priorities = array('Q', bytes(8 * 4))
+        self.acknowledgements = array('Q', bytes(8 * 4))
+        self.src = array('Q', bytes(8 * ADDRESSES))
+        self.group_dest = array('Q', bytes(8 * ADDRESSES))
+        self.lines = array('Q', bytes(8 * LINES))
+
+    def clear(self):
+        self.__init__()
+
+    @property
+    def repeat_ratio(self):
+        return self.repeats / self.telegrams if self.telegrams else 0.0
+
+    def acknowledgement_rates(self):
+        """
+        Share of every kind of acknowledgement in all acknowledgements
+        """
+        total = sum(self.acknowledgements)
+        return {name: count / total if total else 0.0 for name, count in zip(ACKNOWLEDGEMENTS, self.acknowledgements)}
+
+    def priority_distribution(self):
+        return {name: count / self.telegrams if self.telegrams else 0.0 for name, count in zip(PRIORITIES, self.priorities)}
+
+    def top_talkers(self, n=10):
+        """
+        Returns the `n` source addresses with the most telegrams as `(KnxAddress, count)` tuples
+        """
+        return [(KnxAddress.from_int(src), count) for src, count in _largest(self.src, n)]
+
+    def busiest_group_addresses(self, n=10):
+        """
+        Returns the `n` group addresses with the most telegrams as `(KnxAddress, count)` tuples
+        """
+        return [(KnxAddress.from_int(dest, True), count) for dest, count in _largest(self.group_dest, n)]
+
+    def line_counts(self):
+        """
+        Returns the number of telegrams sent from every line as dict, keyed by `'<area>.<line>'`
+        """
+        return {'{}.{}'.format(line >> 4, line & 0b1111): count for line, count in enumerate(self.lines) if count}
+
+    def snapshot(self, n=10):
+        return {
+            'telegrams': self.telegrams,
+            'repeat_ratio': self.repeat_ratio,
+            'priorities': self.priority_distribution(),
+            'acknowledgements': self.acknowledgement_rates(),
+            'lines': self.line_counts(),
+            'top_talkers': [(str(address), count) for address, count in self.top_talkers(n)],
+            'busiest_group_addresses': [(str(address), count) for address, count in self.busiest_group_addresses(n)],
+        }
+
+
+def _largest(counters, n):
+    return heapq.nlargest(n, ((index, count) for index, count in enumerate(counters) if count), key=lambda item: item[1])
+
+
+class _Bucket(object):
+    # what was added to the window during one bucket, to subtract it again on expiry
+
+    __slots__ = ('number', 'telegrams', 'repeats', 'priorities', 'acknowledgements', 'src', 'group_dest')
+
+    def __init__(self, number):
+        self.number = number
+        self.telegrams = 0
+        self.repeats = 0
+        self.priorities = [0] * 4
+        self.acknowledgements = [0] * 4
+        self.src = array('H')
+        self.group_dest = array('H')
+
+
+class BusLoadAnalyzer(object):
+    """
+    Computes bus load statistics incrementally from telegrams.
+
+    `totals` counts all telegrams, `window` only the ones of the last `window` (a `timedelta`), advanced
+    in steps of `bucket`. The window follows the timestamps of the telegrams, which have to be increasing.
+    Acknowledgements have no timestamp and are counted at the time of the last telegram.
+    """
+
+    def __init__(self, window=DEFAULT_WINDOW, bucket=DEFAULT_BUCKET):
+        self.bucket_ns = bucket // timedelta(microseconds=1) * 1000
+        self.buckets = max(1, window // bucket)
+        self.totals = TrafficCounters()
+        self.window = TrafficCounters()
+        self._buckets = deque()
+        self._now = None
+
+    @property
+    def window_seconds(self):
+        return self.buckets * self.bucket_ns / 1e9
+
+    def _advance(self, now):
+        number = now // self.bucket_ns
+        buckets = self._buckets
+        if buckets and buckets[-1].number == number:
+            return buckets[-1]
+
+        # drop all buckets, which are not part of the window ending with bucket `number`
+        while buckets and buckets[0].number <= number - self.buckets:
+            self._expire(buckets.popleft())
+
+        bucket = _Bucket(number)
+        buckets.append(bucket)
+        return bucket
+
+    def _expire(self, bucket):
+        window = self.window
+        window.telegrams -= bucket.telegrams
+        window.repeats -= bucket.repeats
+        for i in range(4):
+            window.priorities[i] -= bucket.priorities[i]
+            window.acknowledgements[i] -= bucket.acknowledgements[i]
+        src = window.src
+        lines = window.lines
+        for address in bucket.src:
+            src[address] -= 1
+            lines[address >> 8] -= 1
+        group_dest = window.group_dest
+        for address in bucket.group_dest:
+            group_dest[address] -= 1
+
+    def advance(self, timestamp):
+        """
+        Moves the window to `timestamp` (a `datetime` or ns since the epoch), without adding a telegram
+        """
+        self._now = datetime_to_ns(timestamp)
+        self._advance(self._now)
+
+    def update(self, telegram):
+        totals = self.totals
+        window = self.window
+
+        acknowledgement = getattr(telegram, 'acknowledgement', None)
+        if acknowledgement is not None:
+            index = ACKNOWLEDGEMENTS.index(str(acknowledgement))
+            totals.acknowledgements[index] += 1
+            if self._now is not None:
+                window.acknowledgements[index] += 1
+                self._advance(self._now).acknowledgements[index] += 1
+            return
+
+        self._now = now = telegram.timestamp_ns
+        bucket = self._advance(now)
+
+        src = int(telegram.src)
+        line = src >> 8
+        priority = int(telegram.priority)
+        repeat = 1 if telegram.repeat else 0
+
+        for counters in (totals, window):
+            counters.telegrams += 1
+            counters.repeats += repeat
+            counters.priorities[priority] += 1
+            counters.src[src] += 1
+            counters.lines[line] += 1
+        bucket.telegrams += 1
+        bucket.repeats += repeat
+        bucket.priorities[priority] += 1
+        bucket.src.append(src)
+
+        dest = telegram.dest
+        if dest.group:
+            dest = int(dest)
+            totals.group_dest[dest] += 1
+            window.group_dest[dest] += 1
+            bucket.group_dest.append(dest)
+
+    def update_many(self, telegrams):
+        update = self.update
+        for telegram in telegrams:
+            update(telegram)
+
+    def update_columns(self, columns):
+        """
+        Adds the rows of `columnar.parse_knx_columns` output to the totals, vectorized with numpy.
+        The sliding window is not updated.
+        """
+        import numpy as np
+
+        totals = self.totals
+        # acknowledgement frames are the only rows of type ACK without payload
+        acknowledgement = (columns['telegram_type'] == int(TelegramType.ACK)) & (columns['payload_size'] == 0)
+        data_rows = columns[~acknowledgement]
+
+        totals.telegrams += len(data_rows)
+        totals.repeats += int(data_rows['repeat'].sum())
+        for counters, values, length in ((totals.priorities, data_rows['priority'], 4),
+                                         (totals.src, data_rows['src'], ADDRESSES),
+                                         (totals.lines, data_rows['src'] >> 8, LINES),
+                                         (totals.group_dest, data_rows['dest'][data_rows['dest_group']], ADDRESSES)):
+            # add to the array in place, through a numpy view of its buffer
+            np.frombuffer(counters, dtype=np.uint64)[:] += np.bincount(values, minlength=length).astype(np.uint64)
+
+        for value in columns['acknowledgement'][acknowledgement]:
+            totals.acknowledgements[ACKNOWLEDGEMENTS.index(str(TelegramAcknowledgement(int(value))))] += 1
+
+    def telegrams_per_second(self):
+        """
+        Telegrams per second over the sliding window
+        """
+        return self.window.telegrams / self.window_seconds
+
+    def line_rates(self):
+        """
+        Telegrams per second of every line over the sliding window, keyed by `'<area>.<line>'`
+        """
+        seconds = self.window_seconds
+        return {line: count / seconds for line, count in self.window.line_counts().items()}
+
+    def snapshot(self, n=10):
+        return {
+            'telegrams_per_second': self.telegrams_per_second(),
+            'line_rates': self.line_rates(),
+            'window': self.window.snapshot(n),
+            'totals': self.totals.snapshot(n),
+        }
+
+    def clear(self):
+        self.totals.clear()
+        self.window.clear()
+        self._buckets.clear()
+        self._now = None
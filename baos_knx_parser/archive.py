@@ -0,0 +1,313 @@
+"""
+On-disk archive of decoded telegrams with time and address indexes.
+
+An archive consists of three files next to each other:
+
+`<path>.records`
+    One fixed-width record (`ARCHIVE_RECORD`) per telegram: timestamp in ns, src, dest, APCI,
+    packed flags, hop count, TPCI byte and the position of the payload in the payload file.
+`<path>.payload`
+    The payloads (TPCI/APCI included) of all telegrams, back to back.
+`<path>.index`
+    Written on close: the first record of every time bucket and, for every src and dest address,
+    the list of records sent from/to it.
+
+Records must be written in chronological order. Reading goes through `mmap`, a query only touches
+the index entries and records it returns.
+"""
+import mmap
+from array import array
+from bisect import bisect_left
+from collections import namedtuple
+from datetime import timedelta
+from struct import Struct
+
+from .const import TelegramType, is_control_tpdu
+from .constructor import construct_telegram
+from .knx import KnxAddress, KnxExtendedTelegram, KnxStandardTelegram, datetime_to_ns, ns_to_datetime
+from .parser import parse_knx_telegram
+
+ARCHIVE_RECORD = Struct('<qHHHHBBQH')  # timestamp, src, dest, apci, flags, hop count, tpci, payload offset, payload size
+ARCHIVE_INDEX_MAGIC = b'BAOSIDX2'  # version 2: 16 bit flags with the extended frame format
+ARCHIVE_INDEX_HEADER = Struct('<qQQQQ')  # bucket size in ns, records, buckets, src addresses, dest addresses
+ARCHIVE_BUCKET = Struct('<qQ')  # bucket number, first record
+ARCHIVE_ADDRESS = Struct('<IQQ')  # address key, first posting, number of postings
+ARCHIVE_POSTING = Struct('<I')  # record number
+
+# flags
+FLAG_GROUP = 0b00000001
+FLAG_REPEAT = 0b00000010
+FLAG_ACK = 0b00000100
+FLAG_CONFIRM = 0b00001000
+# bit 4 and 5 hold the telegram type, bit 6 and 7 the priority, bit 8 to 11 the extended frame format
+
+DEFAULT_BUCKET = timedelta(minutes=1)
+
+
+def _address_key(address):
+    # raw value with bit 16 set for group addresses, the same key KnxAddress uses for interning
+    return int(address) | 0x10000 if address.group else int(address)
+
+
+class ArchiveRecord(namedtuple('ArchiveRecord', ('timestamp_ns', 'src', 'dest', 'apci', 'flags', 'hop_count', 'tpci', 'payload'))):
+    __slots__ = ()
+
+    @property
+    def timestamp(self):
+        return ns_to_datetime(self.timestamp_ns)
+
+    @property
+    def telegram_type(self):
+        return self.flags >> 4 & 0b11
+
+    @property
+    def priority(self):
+        return self.flags >> 6 & 0b11
+
+    @property
+    def eff(self):
+        return self.flags >> 8 & 0b1111
+
+    @property
+    def repeat(self):
+        return bool(self.flags & FLAG_REPEAT)
+
+    @property
+    def ack(self):
+        return bool(self.flags & FLAG_ACK)
+
+    @property
+    def confirm(self):
+        return bool(self.flags & FLAG_CONFIRM)
+
+    def to_telegram(self):
+        """
+        Decodes the record into a `KnxStandardTelegram` or `KnxExtendedTelegram`
+        """
+        payload = bytes(self.payload)
+        # control TPDUs consist of the TPCI alone
+        payload_length = -1 if len(payload) == 1 and is_control_tpdu(payload[0]) else len(payload) - 2
+        fields = dict(payload_length=payload_length, payload=payload, telegram_type=self.telegram_type,
+                      repeat=self.repeat, ack=self.ack, priority=self.priority, confirm=self.confirm,
+                      src=self.src, dest=self.dest, hop_count=self.hop_count, timestamp=self.timestamp_ns)
+        if self.telegram_type == TelegramType.EXT:
+            telegram = KnxExtendedTelegram(eff=self.eff, **fields)
+        else:
+            telegram = KnxStandardTelegram(**fields)
+
+        # decode the frame again, for payload_data
+        return parse_knx_telegram(construct_telegram(telegram), self.timestamp_ns)
+
+
+class ArchiveWriter(object):
+    """
+    Appends telegrams to an archive. Acknowledgement telegrams are skipped.
+    The indexes are written on `close()`.
+    """
+
+    def __init__(self, path, bucket=DEFAULT_BUCKET):
+        self.path = path
+        self.bucket_ns = bucket // timedelta(microseconds=1) * 1000
+        self._records = open(path + '.records', 'wb')
+        self._payload = open(path + '.payload', 'wb')
+        self._count = 0
+        self._payload_offset = 0
+        self._last_timestamp = None
+        self._buckets = []
+        self._src = {}
+        self._dest = {}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def write(self, telegram):
+        if not hasattr(telegram, 'src'):
+            return
+
+        timestamp = telegram.timestamp_ns
+        if self._last_timestamp is not None and timestamp < self._last_timestamp:
+            raise ValueError("Telegrams have to be written in chronological order")
+        self._last_timestamp = timestamp
+
+        bucket = timestamp // self.bucket_ns
+        if not self._buckets or self._buckets[-1][0] != bucket:
+            self._buckets.append((bucket, self._count))
+
+        flags = int(telegram.priority) << 6 | int(telegram.telegram_type) << 4
+        if telegram.dest.group:
+            flags |= FLAG_GROUP
+        if telegram.repeat:
+            flags |= FLAG_REPEAT
+        if telegram.ack:
+            flags |= FLAG_ACK
+        if telegram.confirm:
+            flags |= FLAG_CONFIRM
+        flags |= (getattr(telegram, 'eff', None) or 0) << 8
+
+        payload = telegram.payload
+        apci = telegram.apci if len(payload) >= 2 else None
+        self._records.write(ARCHIVE_RECORD.pack(
+            timestamp, int(telegram.src), int(telegram.dest), int(apci) if apci is not None else 0, flags,
+            telegram.hop_count, payload[0] if payload else 0, self._payload_offset, len(payload)))
+        self._payload.write(payload)
+        self._payload_offset += len(payload)
+
+        self._src.setdefault(_address_key(telegram.src), array('I')).append(self._count)
+        self._dest.setdefault(_address_key(telegram.dest), array('I')).append(self._count)
+        self._count += 1
+
+    def write_many(self, telegrams):
+        write = self.write
+        for telegram in telegrams:
+            write(telegram)
+
+    def close(self):
+        self._records.close()
+        self._payload.close()
+
+        with open(self.path + '.index', 'wb') as index:
+            index.write(ARCHIVE_INDEX_MAGIC)
+            index.write(ARCHIVE_INDEX_HEADER.pack(self.bucket_ns, self._count, len(self._buckets), len(self._src), len(self._dest)))
+            for bucket in self._buckets:
+                index.write(ARCHIVE_BUCKET.pack(*bucket))
+
+            # address tables, followed by the postings of all addresses
+            posting = 0
+            for addresses in (self._src, self._dest):
+                for key in sorted(addresses):
+                    index.write(ARCHIVE_ADDRESS.pack(key, posting, len(addresses[key])))
+                    posting += len(addresses[key])
+            for addresses in (self._src, self._dest):
+                for key in sorted(addresses):
+                    index.write(b''.join(ARCHIVE_POSTING.pack(record) for record in addresses[key]))
+
+
+class Archive(object):
+    """
+    Memory mapped, read only access to an archive
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._records = self._map(path + '.records')
+        self._payload = self._map(path + '.payload')
+        self._index = self._map(path + '.index')
+
+        index = self._index
+        if index[0:len(ARCHIVE_INDEX_MAGIC)] != ARCHIVE_INDEX_MAGIC:
+            raise ValueError("{} is not an archive index".format(path + '.index'))
+
+        offset = len(ARCHIVE_INDEX_MAGIC)
+        self.bucket_ns, self._count, buckets, src_count, dest_count = ARCHIVE_INDEX_HEADER.unpack_from(index, offset)
+        offset += ARCHIVE_INDEX_HEADER.size
+
+        self._bucket_numbers = []
+        self._bucket_records = []
+        for bucket, record in ARCHIVE_BUCKET.iter_unpack(index[offset:offset + buckets * ARCHIVE_BUCKET.size]):
+            self._bucket_numbers.append(bucket)
+            self._bucket_records.append(record)
+        offset += buckets * ARCHIVE_BUCKET.size
+
+        self._src = self._read_addresses(offset, src_count)
+        offset += src_count * ARCHIVE_ADDRESS.size
+        self._dest = self._read_addresses(offset, dest_count)
+        offset += dest_count * ARCHIVE_ADDRESS.size
+        self._postings = offset
+
+    @staticmethod
+    def _map(file):
+        with open(file, 'rb') as f:
+            try:
+                return memoryview(mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ))
+            except ValueError:
+                # empty files can not be mapped
+                return memoryview(b'')
+
+    def _read_addresses(self, offset, count):
+        return {key: (first, number)
+                for key, first, number in ARCHIVE_ADDRESS.iter_unpack(self._index[offset:offset + count * ARCHIVE_ADDRESS.size])}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def __len__(self):
+        return self._count
+
+    def close(self):
+        for view in (self._records, self._payload, self._index):
+            view.release()
+
+    def _timestamp(self, record):
+        return ARCHIVE_RECORD.unpack_from(self._records, record * ARCHIVE_RECORD.size)[0]
+
+    def record(self, record):
+        timestamp, src, dest, apci, flags, hop_count, tpci, payload_offset, payload_size = \
+            ARCHIVE_RECORD.unpack_from(self._records, record * ARCHIVE_RECORD.size)
+        return ArchiveRecord(timestamp, KnxAddress.from_int(src), KnxAddress.from_int(dest, flags & FLAG_GROUP), apci,
+                             flags, hop_count, tpci, self._payload[payload_offset:payload_offset + payload_size])
+
+    def _posting(self, first, number):
+        return ARCHIVE_POSTING.unpack_from(self._index, self._postings + (first + number) * ARCHIVE_POSTING.size)[0]
+
+    def query(self, src=None, dest=None, start=None, end=None):
+        """
+        Yields the records from `src` to `dest` with `start <= timestamp < end`, all arguments are optional.
+        Addresses are `KnxAddress` objects or strings, `src` a physical and `dest` a group address if given
+        as string. Timestamps are `datetime` objects or ns since the epoch.
+        """
+        start = datetime_to_ns(start) if start is not None else None
+        end = datetime_to_ns(end) if end is not None else None
+        if isinstance(src, str):
+            src = KnxAddress(src)
+        if isinstance(dest, str):
+            dest = KnxAddress(dest, group=True)
+
+        candidates = []
+        for address, addresses in ((src, self._src), (dest, self._dest)):
+            if address is not None:
+                candidates.append(addresses.get(_address_key(address), (0, 0)))
+
+        if candidates:
+            # walk the shortest posting list, the other address is checked per record
+            first, number = min(candidates, key=lambda candidate: candidate[1])
+            low = 0
+            if start is not None:
+                low = _bisect(lambda i: self._timestamp(self._posting(first, i)), start, number)
+            records = (self._posting(first, i) for i in range(low, number))
+        else:
+            low = 0
+            if start is not None:
+                # all records before the bucket of `start` are older
+                bucket = bisect_left(self._bucket_numbers, start // self.bucket_ns)
+                low = self._bucket_records[bucket] if bucket < len(self._bucket_records) else self._count
+            records = range(low, self._count)
+
+        for record in records:
+            telegram = self.record(record)
+            if end is not None and telegram.timestamp_ns >= end:
+                break
+            if start is not None and telegram.timestamp_ns < start:
+                continue
+            if src is not None and telegram.src != src:
+                continue
+            if dest is not None and telegram.dest != dest:
+                continue
+            yield telegram
+
+
+def _bisect(key, value, count):
+    # first index in 0..count with key(index) >= value
+    low, high = 0, count
+    while low < high:
+        middle = (low + high) // 2
+        if key(middle) < value:
+            low = middle + 1
+        else:
+            high = middle
+    return low
@@ -22,6 +22,8 @@ class Bitmask(object):
                 return (self.value & self.mask) == (other & self.mask)
             else:
                 return self.value == other
+        else:
+            return NotImplemented
 
     def __lt__(self, other):
 
@@ -42,7 +44,8 @@ class Bitmask(object):
             raise NotImplementedError("Not supported comparision")
 
     def __hash__(self):
-        return hash((self.value, self.mask))
+        # equal Bitmasks share the value, so members of a BitmaskEnum can hash by their code
+        return hash(self.value)
 
     def __repr__(self):
         return "Bitmask({value}, {mask})".format(value=bin(self.value), mask=bin(self.mask) if self.mask else None)
@@ -51,10 +54,20 @@ class Bitmask(object):
         return self.value
 
 
-class BitmaskEnum(object):
+class BitmaskEnumMeta(type):
+    """
+    Builds the lookup tables of a BitmaskEnum once, when the class is created.
+
+    Every member is a cached singleton. Integer values are resolved through a dense table,
+    which covers every code up to the widest member, with masked members expanded to all codes they match.
+    """
+
+    def __init__(cls, name, bases, namespace):
+        super(BitmaskEnumMeta, cls).__init__(name, bases, namespace)
 
-    def __new__(cls, value):
         cls._attr_map = OrderedDict()
+        cls._members = OrderedDict()
+        cls._value_table = ()
 
         # create a map name -> Bitmask|int
         for member in filter(lambda m: not m.startswith('_'), dir(cls)):
@@ -62,36 +75,59 @@ class BitmaskEnum(object):
             if isinstance(attr, (Bitmask, int)):
                 cls._attr_map[member] = attr
 
-        return super(BitmaskEnum, cls).__new__(cls)
-
-    def __init__(self, value):
-        self._value = None
-        self._name = None
-        self._bitmask = None
-
-        if isinstance(value, BitmaskEnum):
-            value = value._value
-
-        if isinstance(value, (Bitmask, int)):
-            self._value = value
-
-            for name, attr in self._attr_map.items():
+        if not cls._attr_map:
+            return
+
+        # create a map name -> singleton
+        for member, attr in cls._attr_map.items():
+            instance = super(BitmaskEnumMeta, cls).__call__()
+            instance._value = attr
+            instance._name = member
+            instance._bitmask = attr
+            instance._code = int(attr)
+            cls._members[member] = instance
+
+        # create a dense table code -> singleton. Masked members are expanded first,
+        # so members with an exact value take precedence
+        width = max(int(attr).bit_length() for attr in cls._attr_map.values())
+        table = [None] * (1 << width)
+        for member, attr in cls._attr_map.items():
+            if isinstance(attr, Bitmask) and attr.mask:
+                for code in range(len(table)):
+                    if attr == code:
+                        table[code] = cls._members[member]
+        for member, attr in cls._attr_map.items():
+            if not (isinstance(attr, Bitmask) and attr.mask):
+                table[int(attr)] = cls._members[member]
+
+        cls._value_table = tuple(table)
+
+    def __call__(cls, value):
+        if isinstance(value, int):
+            if 0 <= value < len(cls._value_table):
+                member = cls._value_table[value]
+                if member is not None:
+                    return member
+
+        elif isinstance(value, cls):
+            return value
+
+        elif isinstance(value, BitmaskEnum):
+            return cls(value._value)
+
+        elif isinstance(value, Bitmask):
+            for member, attr in cls._attr_map.items():
                 if attr == value:
-                    self._bitmask = attr
-                    self._name = name
-
-            if not self._name:
-                raise ValueError("{value} is not a valid {cls}".format(value=value, cls=self.__class__.__name__))
+                    return cls._members[member]
 
         elif isinstance(value, str):
-            if value in self._attr_map:
-                self._bitmask = self._attr_map[value]
-                self._name = value
-                self._value = self._bitmask.value
-            else:
-                raise ValueError("{value} is not a valid {cls}".format(value=value, cls=self.__class__.__name__))
+            if value in cls._members:
+                return cls._members[value]
+
+        raise ValueError("{value} is not a valid {cls}".format(value=value, cls=cls.__name__))
 
-        return super(BitmaskEnum, self).__init__()
+
+class BitmaskEnum(object, metaclass=BitmaskEnumMeta):
 
     def __repr__(self):
         return "{cls}.{value}".format(cls=self.__class__.__name__, value=self._name)
@@ -100,13 +136,23 @@ class BitmaskEnum(object):
         return self._name
 
     def __int__(self):
-        return int(self._value)
+        return self._code
 
     def __float__(self):
-        return float(self._value)
+        return float(self._code)
 
     def __eq__(self, other):
         if isinstance(other, BitmaskEnum):
             return self._bitmask == other._bitmask and self._name == other._name
-        else:
-            return self._bitmask == other
+        elif isinstance(other, (Bitmask, int)):
+            # only the code of the member, not every code a masked member matches, to stay consistent with the hash
+            return self._code == int(other)
+        return NotImplemented
+
+    def __hash__(self):
+        # equal ints and Bitmasks hash alike
+        return hash(self._code)
+
+    def __reduce__(self):
+        # unpickle and copy to the singleton, not a new instance
+        return self.__class__, (self._name, )
@@ -0,0 +1,90 @@
+"""
+Memoizing decoder for repetitive bus traffic.
+
+Cyclic sends, heartbeats and repeated status responses produce byte for byte identical frames.
+`DecodeCache` decodes every distinct frame once and answers repetitions with a shallow copy of the
+decoded telegram, with only the timestamp swapped in. Acknowledgements are copied as well.
+"""
+from collections import OrderedDict
+from itertools import repeat
+
+from .parser import parse_knx_telegram
+
+DEFAULT_MAXSIZE = 4096
+
+
+class DecodeCache(object):
+    """
+    Bounded LRU cache of decoded telegrams, keyed on the message code and the frame bytes behind the
+    cEMI additional info. At most `maxsize` frames are kept.
+
+    Returned telegrams are shallow copies: the payload and payload_data are shared with the cached
+    telegram and must not be modified.
+    """
+
+    def __init__(self, maxsize=DEFAULT_MAXSIZE):
+        self.maxsize = maxsize
+        self._telegrams = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def parse(self, binary, timestamp=None):
+        """
+        Like `parse_knx_telegram`, but served from the cache for frames seen before
+        """
+        key = (binary[0], bytes(binary[binary[1] + 2:]))
+        telegrams = self._telegrams
+        telegram = telegrams.get(key)
+
+        if telegram is None:
+            self.misses += 1
+            # decode a copy, so the cached payload does not point into a buffer of the caller
+            telegram = telegrams[key] = parse_knx_telegram(bytes(binary), timestamp)
+            if len(telegrams) > self.maxsize:
+                telegrams.popitem(last=False)
+                self.evictions += 1
+        else:
+            self.hits += 1
+            telegrams.move_to_end(key)
+
+        copy = telegram.__copy__()
+        if hasattr(copy, 'timestamp'):
+            # acknowledgements have no timestamp
+            copy.timestamp = timestamp
+        return copy
+
+    def parse_many(self, frames, timestamps=None):
+        """
+        Yields one telegram per frame, see `parser.parse_knx_telegrams`
+        """
+        if timestamps is None:
+            timestamps = repeat(None)
+
+        parse = self.parse
+        for binary, timestamp in zip(frames, timestamps):
+            yield parse(binary, timestamp)
+
+    @property
+    def hit_rate(self):
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def stats(self):
+        return {
+            'size': len(self._telegrams),
+            'maxsize': self.maxsize,
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'hit_rate': self.hit_rate,
+        }
+
+    def __len__(self):
+        return len(self._telegrams)
+
+    def clear(self):
+        self._telegrams.clear()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
@@ -0,0 +1,92 @@
+"""
+Binary capture files of raw cEMI frames.
+
+A capture file starts with `CAPTURE_MAGIC`, followed by one record per frame:
+a big endian header holding the timestamp as nanoseconds since the epoch and the frame length,
+followed by the frame itself.
+
+Reading goes through `mmap`, every frame is handed out as a `memoryview` into the mapped file.
+This way captures of any size can be scanned with constant memory.
+"""
+import mmap
+import time
+from struct import Struct
+
+from .knx import datetime_to_ns
+from .parser import parse_knx_telegram
+
+CAPTURE_MAGIC = b'BAOSCAP1'
+CAPTURE_RECORD_HEADER = Struct('>qH')  # timestamp in ns, frame length
+
+
+class CaptureWriter(object):
+    """
+    Appends cEMI frames to a capture file.
+    """
+
+    def __init__(self, file):
+        self._file = open(file, 'wb')
+        self._file.write(CAPTURE_MAGIC)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def write(self, frame, timestamp=None):
+        timestamp = datetime_to_ns(timestamp) if timestamp is not None else time.time_ns()
+
+        self._file.write(CAPTURE_RECORD_HEADER.pack(timestamp, len(frame)))
+        self._file.write(frame)
+
+    def close(self):
+        self._file.close()
+
+
+def iter_capture_frames(file):
+    """
+    Walks a capture file frame by frame and yields `(timestamp_ns, frame)` tuples,
+    where `frame` is a `memoryview` into the memory mapped file.
+    """
+    with open(file, 'rb') as f:
+        try:
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            # empty files can not be mapped
+            return
+
+    try:
+        view = memoryview(mapped)
+        if view[0:len(CAPTURE_MAGIC)] != CAPTURE_MAGIC:
+            raise ValueError("{} is not a capture file".format(file))
+
+        unpack_header = CAPTURE_RECORD_HEADER.unpack_from
+        header_size = CAPTURE_RECORD_HEADER.size
+        offset = len(CAPTURE_MAGIC)
+        size = len(view)
+
+        while offset + header_size <= size:
+            timestamp, length = unpack_header(view, offset)
+            offset += header_size
+            if offset + length > size:
+                raise ValueError("Truncated frame at offset {} in {}".format(offset, file))
+
+            yield timestamp, view[offset:offset + length]
+            offset += length
+    finally:
+        view.release()
+        try:
+            mapped.close()
+        except BufferError:
+            # frames (or payloads of parsed telegrams) are still referenced,
+            # the mapping is closed once they are garbage collected
+            pass
+
+
+def read_capture(file):
+    """
+    Parses all frames of a capture file. The payloads of the telegrams are views into the mapped file.
+    """
+    for timestamp, frame in iter_capture_frames(file):
+        yield parse_knx_telegram(frame, timestamp)
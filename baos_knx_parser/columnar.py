@@ -0,0 +1,273 @@
+"""
+Columnar decoding of many cEMI frames into a NumPy structured array.
+
+No telegram objects are created; every field is extracted with vectorized
+operations directly from the raw bytes. The payload of row `i` can be found at
+`buffer[columns['payload_offset'][i]:columns['payload_offset'][i] + columns['payload_size'][i]]`.
+
+This module requires numpy.
+"""
+from itertools import accumulate
+
+import numpy as np
+
+from .const import APCI, TelegramType
+from .dpt import dpt_decoder, get_dpt_decoder
+from .knx import datetime_to_ns
+from .state import GROUP_VALUE_APCIS
+
+TELEGRAM_DTYPE = np.dtype([
+    ('timestamp', 'M8[us]'),
+    ('msg_code', 'u1'),
+    ('src', 'u2'),
+    ('dest', 'u2'),
+    ('dest_group', '?'),
+    ('telegram_type', 'u1'),  # TelegramType.ACK for L_Busmon.ind acknowledgement frames
+    ('acknowledgement', 'u1'),  # only set for acknowledgement frames
+    ('priority', 'u1'),
+    ('repeat', '?'),
+    ('ack', '?'),
+    ('confirm', '?'),
+    ('hop_count', 'u1'),
+    ('apci', 'u2'),
+    ('tpci', 'u1'),
+    ('packet_number', 'u1'),
+    ('payload_length', 'i2'),
+    ('payload_offset', 'u8'),
+    ('payload_size', 'u2'),
+])
+
+# raw APCI codes of the telegrams carrying a group value
+GROUP_VALUE_CODES = np.array([code for code, member in enumerate(APCI._value_table) if member in GROUP_VALUE_APCIS])
+
+DPT_COLUMN_DECODERS = {}
+
+
+def _timestamp_column(timestamps):
+    # the same instants (UTC) as telegram.timestamp_ns, naive datetimes are local time, see knx.datetime_to_ns
+    if isinstance(timestamps, np.ndarray) and timestamps.dtype.kind == 'M':
+        return timestamps.astype('M8[us]')
+    return np.fromiter((datetime_to_ns(timestamp) // 1000 for timestamp in timestamps), dtype=np.int64).view('M8[us]')
+
+
+def parse_knx_columns(frames, timestamps=None):
+    """
+    Decodes an iterable of cEMI frames into columns.
+
+    Returns a tuple `(columns, buffer)`, where `buffer` is the concatenation of all frames.
+    """
+    frames = list(frames)
+    offsets = [0]
+    offsets.extend(accumulate(len(frame) for frame in frames[:-1]))
+    return parse_knx_stream_columns(b''.join(frames), offsets, timestamps)
+
+
+def parse_knx_stream_columns(buffer, offsets, timestamps=None):
+    """
+    Decodes frames stored back to back in `buffer` into columns.
+
+    `offsets` holds the start offset of every frame, see `parser.parse_knx_stream`.
+    Returns a tuple `(columns, buffer)`, the payload offsets point into the given buffer.
+    The timestamp column holds UTC, converted like the timestamps of telegrams (see `knx.datetime_to_ns`).
+    """
+    data = np.frombuffer(buffer, dtype=np.uint8)
+    starts = np.asarray(offsets, dtype=np.int64)
+    columns = np.zeros(len(starts), dtype=TELEGRAM_DTYPE)
+    if not len(starts):
+        return columns, buffer
+
+    ends = np.empty_like(starts)
+    ends[:-1] = starts[1:]
+    ends[-1] = len(data)
+
+    last = len(data) - 1
+
+    def take(index):
+        # reads past the end of short frames are clipped, those rows are masked out below
+        return data[np.minimum(index, last)].astype(np.int64)
+
+    # check message code
+    msg_code = take(starts)
+    unknown = (msg_code != 0x29) & (msg_code != 0x2B)
+    if unknown.any():
+        raise TypeError("Can only parse L_Data.ind (0x29) and L_Busmon.ind (0x2B) at the moment, but got {}".format(
+            hex(msg_code[unknown][0])))
+
+    add_len = take(starts + 1)
+    knx_start = starts + 2 + add_len
+
+    busmon = msg_code == 0x2B
+    acknowledgement = busmon & (ends - knx_start == 1)
+
+    # parse CTRL
+    ctrl = take(knx_start)
+
+    # parse CTRLE / NPCI, both share the address type and hop count bits.
+    # Only standard frames on the bus carry the NPCI, extended ones are laid out like L_Data.ind
+    npci_layout = busmon & (ctrl >> 6 != int(TelegramType.EXT))
+    npci = np.where(npci_layout, take(knx_start + 5), take(knx_start + 1))
+
+    # parse addresses
+    src_start = knx_start + np.where(npci_layout, 1, 2)
+    dest_start = src_start + 2
+    src = take(src_start) << 8 | take(src_start + 1)
+    dest = take(dest_start) << 8 | take(dest_start + 1)
+
+    # parse payload
+    payload_start = knx_start + np.where(npci_layout, 6, 7)
+    tpdu = take(payload_start)
+    # control TPDUs consist of the TPCI alone, see const.is_control_tpdu
+    payload_length = np.where(tpdu >> 7 == 1, -1, np.where(npci_layout, (npci & 0x0F) - 1, take(knx_start + 6) - busmon))
+    payload_end = np.minimum(payload_start + payload_length + 2, ends)
+    payload_size = np.maximum(payload_end - payload_start, 0)
+
+    apci_low = take(payload_start + 1)
+    has_tpci = payload_size >= 1
+    has_apci = payload_size >= 2
+
+    data_frame = ~acknowledgement
+    columns['msg_code'] = msg_code
+    columns['src'] = np.where(data_frame, src, 0)
+    columns['dest'] = np.where(data_frame, dest, 0)
+    columns['dest_group'] = data_frame & (npci >> 7 == 1)
+    columns['telegram_type'] = np.where(data_frame, ctrl >> 6, int(TelegramType.ACK))
+    columns['acknowledgement'] = np.where(acknowledgement, ctrl, 0)
+    columns['priority'] = np.where(data_frame, ctrl >> 2 & 0b11, 0)
+    # repeat, acknowledge request and confirm flag are send inverted
+    columns['repeat'] = data_frame & (ctrl & 0b00100000 == 0)
+    columns['ack'] = data_frame & (ctrl & 0b00000010 == 0)
+    columns['confirm'] = data_frame & (ctrl & 0b00000001 == 0)
+    columns['hop_count'] = np.where(data_frame, npci >> 4 & 0b111, 0)
+    columns['tpci'] = np.where(data_frame & has_tpci, tpdu >> 6, 0)
+    columns['packet_number'] = np.where(data_frame & has_tpci, tpdu >> 2 & 0b1111, 0)
+    columns['apci'] = np.where(data_frame & has_apci, (tpdu & 0b11) << 8 | apci_low, 0)
+    columns['payload_length'] = np.where(data_frame, payload_length, 0)
+    columns['payload_offset'] = np.where(data_frame, payload_start, 0)
+    columns['payload_size'] = np.where(data_frame, payload_size, 0)
+
+    if timestamps is None:
+        columns['timestamp'] = np.datetime64('NaT')
+    else:
+        columns['timestamp'] = _timestamp_column(timestamps)
+
+    return columns, buffer
+
+
+def group_values(columns, buffer):
+    """
+    Extracts the raw values of group telegrams with up to 4 bytes of payload data, the vectorized
+    counterpart of `payload_data`. Returns a tuple `(values, valid)` of an uint32 array of the values
+    and a bool array masking the rows which carry one.
+    """
+    data = np.frombuffer(buffer, dtype=np.uint8)
+    values = np.zeros(len(columns), dtype=np.uint32)
+    if not len(data):
+        return values, np.zeros(len(columns), dtype=bool)
+
+    last = len(data) - 1
+
+    def take(index):
+        return data[np.minimum(index, last)].astype(np.uint32)
+
+    offset = columns['payload_offset'].astype(np.int64)
+    length = columns['payload_length'].astype(np.int64)
+    valid = np.isin(columns['apci'], GROUP_VALUE_CODES) & columns['dest_group'] \
+        & (length >= 0) & (length <= 4) & (columns['payload_size'] >= length + 2)
+
+    # values of up to 6 bit are stored in the APCI byte
+    values = np.where(length == 0, take(offset + 1) & 0b111111, 0).astype(np.uint32)
+    for i in range(4):
+        values = np.where(length > i, values << 8 | take(offset + 2 + i), values)
+
+    values[~valid] = 0
+    return values, valid
+
+
+def decode_dpt_column(dpt, values):
+    """
+    Decodes an array of raw group values as datapoint type `dpt`. Only numeric DPTs are supported.
+    """
+    return get_dpt_decoder(dpt, DPT_COLUMN_DECODERS)(np.asarray(values, dtype=np.uint32))
+
+
+def decode_dpt_columns(columns, buffer, mapping):
+    """
+    Decodes the group values of all rows whose destination is mapped in `mapping` (a `dpt.DptMapping`).
+    Returns a float64 array, which is NaN for all other rows.
+    """
+    values, valid = group_values(columns, buffer)
+    result = np.full(len(columns), np.nan)
+    dest = columns['dest']
+
+    for address in np.unique(dest[valid]):
+        dpt = mapping.get(int(address))
+        if dpt is None:
+            continue
+        rows = valid & (dest == address)
+        result[rows] = decode_dpt_column(dpt, values[rows])
+
+    return result
+
+
+@dpt_decoder(1, decoders=DPT_COLUMN_DECODERS)
+def _decode_boolean_column(values):
+    return (values & 0b1).astype(bool)
+
+
+@dpt_decoder(5, '5.004', '5.010', decoders=DPT_COLUMN_DECODERS)
+def _decode_unsigned_8_column(values):
+    return (values & 0xFF).astype(np.uint8)
+
+
+@dpt_decoder('5.001', decoders=DPT_COLUMN_DECODERS)
+def _decode_scaling_column(values):
+    return (values & 0xFF) * (100 / 255)
+
+
+@dpt_decoder('5.003', decoders=DPT_COLUMN_DECODERS)
+def _decode_angle_column(values):
+    return (values & 0xFF) * (360 / 255)
+
+
+@dpt_decoder(6, decoders=DPT_COLUMN_DECODERS)
+def _decode_signed_8_column(values):
+    return (values & 0xFF).astype(np.uint8).view(np.int8)
+
+
+@dpt_decoder(7, decoders=DPT_COLUMN_DECODERS)
+def _decode_unsigned_16_column(values):
+    return (values & 0xFFFF).astype(np.uint16)
+
+
+@dpt_decoder(8, decoders=DPT_COLUMN_DECODERS)
+def _decode_signed_16_column(values):
+    return (values & 0xFFFF).astype(np.uint16).view(np.int16)
+
+
+@dpt_decoder(9, decoders=DPT_COLUMN_DECODERS)
+def _decode_float_16_column(values):
+    mantissa = (values & 0x07FF).astype(np.int64) - np.where(values & 0x8000, 0x0800, 0)
+    result = np.ldexp(0.01 * mantissa, (values >> 11 & 0b1111).astype(np.int32))
+    # invalid data
+    result[values & 0xFFFF == 0x7FFF] = np.nan
+    return result
+
+
+@dpt_decoder(12, decoders=DPT_COLUMN_DECODERS)
+def _decode_unsigned_32_column(values):
+    return values.astype(np.uint32)
+
+
+@dpt_decoder(13, decoders=DPT_COLUMN_DECODERS)
+def _decode_signed_32_column(values):
+    return values.astype(np.uint32).view(np.int32)
+
+
+@dpt_decoder(14, decoders=DPT_COLUMN_DECODERS)
+def _decode_float_32_column(values):
+    return values.astype(np.uint32).view(np.float32)
+
+
+@dpt_decoder(17, decoders=DPT_COLUMN_DECODERS)
+def _decode_scene_number_column(values):
+    return (values & 0b111111).astype(np.uint8)
@@ -69,6 +69,15 @@ class TPCI(BitmaskEnum):
     NUMBERED_CONTROL_PACKET      = 0b11
 
 
+def is_control_tpdu(tpci):
+    """
+    Tells whether the TPDU starting with the byte `tpci` is a control TPDU (T_CONNECT, T_DISCONNECT, T_ACK,
+    T_NAK). Control TPDUs consist of the TPCI byte alone: the payload of their telegrams is this single byte
+    with a payload_length of -1, the length field of their frames is 0.
+    """
+    return tpci & 0b10000000 != 0
+
+
 class TelegramType(BitmaskEnum):
     POLL  = 0b11
     ACK   = 0b01
@@ -1,10 +1,88 @@
-
 from . import struct
+from .const import is_control_tpdu
+
+# the length byte of L_Data frames, 255 is reserved as escape
+MAX_PAYLOAD_LENGTH = 254
 
 
 def construct_payload(tpci, sequence_number, apci, payload=None):
-    binary = struct.KNX_TPCI_APCI.pack(int(tpci), int(sequence_number), int(apci))
+    # see struct.KNX_TPCI_APCI
+    binary = (int(tpci) << 14 | int(sequence_number) << 10 | int(apci)).to_bytes(2, 'big')
     if payload:
         binary += payload
 
     return binary
+
+
+def construct_ctrl(telegram_type, repeat, priority, ack, confirm):
+    # see struct.KNX_CTRL. repeat, ack and confirm flag are send inverted, the broadcast flag is always set
+    return int(telegram_type) << 6 | (not repeat) << 5 | 1 << 4 | int(priority) << 2 | (not ack) << 1 | (not confirm)
+
+
+def construct_ctrle(group, hop_count, eff=0):
+    # see struct.KNX_CTRLE
+    return bool(group) << 7 | hop_count << 4 | eff
+
+
+def pack_telegram_into(buffer, offset, telegram):
+    """
+    Writes `telegram` as L_Data.ind (0x29) frame, or as L_Busmon.ind (0x2B) frame for acknowledgements,
+    into `buffer` at `offset`. Returns the offset behind the frame.
+    """
+    acknowledgement = getattr(telegram, 'acknowledgement', None)
+    if acknowledgement is not None:
+        struct.CEMI_BUSMON_ACK.pack_into(buffer, offset, 0x2B, 0, int(acknowledgement))
+        return offset + struct.CEMI_BUSMON_ACK.size
+
+    payload_length = telegram.payload_length
+    if payload_length == -1 and len(telegram.payload) == 1 and is_control_tpdu(telegram.payload[0]):
+        # control TPDUs consist of the TPCI alone and are sent with a length of 0
+        payload_length = 0
+    elif not 0 <= payload_length <= MAX_PAYLOAD_LENGTH or len(telegram.payload) != payload_length + 2:
+        raise ValueError("Invalid payload length {}, for {} bytes of payload".format(payload_length, len(telegram.payload)))
+
+    struct.CEMI_DATA_IND_HEADER.pack_into(
+        buffer, offset,
+        0x29,  # cEMI header
+        0,  # no additional cEMI/BAOS info here, since they are not stored in the KNX Datamodel
+        construct_ctrl(telegram.telegram_type, telegram.repeat, telegram.priority, telegram.ack, telegram.confirm),
+        construct_ctrle(telegram.dest.group, telegram.hop_count, getattr(telegram, 'eff', None) or 0),
+        int(telegram.src),
+        int(telegram.dest),
+        payload_length,
+    )
+    offset += struct.CEMI_DATA_IND_HEADER.size
+    end = offset + len(telegram.payload)
+    buffer[offset:end] = telegram.payload
+    return end
+
+
+def frame_size(telegram):
+    if getattr(telegram, 'acknowledgement', None) is not None:
+        return struct.CEMI_BUSMON_ACK.size
+    return struct.CEMI_DATA_IND_HEADER.size + len(telegram.payload)
+
+
+def construct_telegram(telegram):
+    binary = bytearray(frame_size(telegram))
+    pack_telegram_into(binary, 0, telegram)
+    return bytes(binary)
+
+
+def serialize_many(telegrams):
+    """
+    Writes all telegrams back to back into one preallocated `bytearray`.
+    Returns the buffer and the start offset of every frame, as expected by `parser.parse_knx_stream`.
+    """
+    telegrams = list(telegrams)
+    offsets = []
+    size = 0
+    for telegram in telegrams:
+        offsets.append(size)
+        size += frame_size(telegram)
+
+    buffer = bytearray(size)
+    for offset, telegram in zip(offsets, telegrams):
+        pack_telegram_into(buffer, offset, telegram)
+
+    return buffer, offsets
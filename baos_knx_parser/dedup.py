@@ -0,0 +1,150 @@
+"""
+Removal of repeated and duplicated frames from bus monitor streams, before they are decoded.
+
+A frame is a duplicate if a frame with the same KNX bytes was seen within the time window, ignoring
+the repeat bit of CTRL and the checksum of busmon frames. Duplicates with the repeat bit set are
+repetitions sent on the bus, the others usually come from capturing on several interfaces.
+Acknowledgement frames are paired with the data frame before them and share its fate.
+"""
+import time
+from collections import deque
+from datetime import timedelta
+
+from .knx import KnxAcknowledgementTelegram, datetime_to_ns
+
+DEFAULT_WINDOW = timedelta(seconds=1)
+DEFAULT_MAX_SIZE = 4096
+
+
+def frame_key(binary):
+    """
+    Returns a hash of the KNX part of a cEMI frame with the repeat bit cleared, or None for
+    busmon acknowledgement frames and frames which are too short
+    """
+    k = binary[1] + 2  # start of the KNX frame
+    if binary[0] == 0x2B:
+        # the checksum covers the repeat bit, leave it out
+        knx = binary[k:len(binary) - 1]
+    else:
+        knx = binary[k:]
+
+    if len(knx) < 2:
+        return None
+    return hash(bytes((knx[0] | 0b00100000, )) + bytes(knx[1:]))
+
+
+class FrameDeduplicator(object):
+    """
+    Decides for every frame of a stream, whether it is new or a duplicate within `window` (a `timedelta`).
+    At most `max_size` recent frames are remembered, so memory stays bounded on busy lines.
+    """
+
+    def __init__(self, window=DEFAULT_WINDOW, max_size=DEFAULT_MAX_SIZE):
+        self.window_ns = window // timedelta(microseconds=1) * 1000
+        self.max_size = max_size
+        self._recent = deque()
+        self._seen = {}
+        self._last_kept = True
+        self.frames = 0
+        self.repeats = 0
+        self.duplicates = 0
+        self.acknowledgements = 0
+        self.dropped_acknowledgements = 0
+
+    def feed(self, binary, timestamp=None):
+        """
+        Returns whether `binary` should be kept. `timestamp` is a `datetime`, ns since the epoch
+        or None for now; it has to be increasing.
+        """
+        self.frames += 1
+        key = frame_key(binary)
+        if key is None:
+            # acknowledgements follow the data frame they belong to
+            if self._last_kept:
+                self.acknowledgements += 1
+                return True
+            self.dropped_acknowledgements += 1
+            return False
+
+        now = datetime_to_ns(timestamp) if timestamp is not None else time.time_ns()
+        recent = self._recent
+        seen = self._seen
+        deadline = now - self.window_ns
+        while recent and (recent[0][0] < deadline or len(recent) >= self.max_size):
+            first, first_key = recent.popleft()
+            if seen.get(first_key) == first:
+                del seen[first_key]
+
+        if key in seen:
+            k = binary[1] + 2
+            if binary[k] & 0b00100000:
+                self.duplicates += 1
+            else:
+                self.repeats += 1
+            self._last_kept = False
+            return False
+
+        seen[key] = now
+        recent.append((now, key))
+        self._last_kept = True
+        return True
+
+    @property
+    def collapsed(self):
+        """
+        Number of dropped data frames
+        """
+        return self.repeats + self.duplicates
+
+    def stats(self):
+        return {
+            'frames': self.frames,
+            'repeats': self.repeats,
+            'duplicates': self.duplicates,
+            'acknowledgements': self.acknowledgements,
+            'dropped_acknowledgements': self.dropped_acknowledgements,
+        }
+
+    def clear(self):
+        self._recent.clear()
+        self._seen.clear()
+        self._last_kept = True
+
+
+def deduplicate(frames, timestamps=None, window=DEFAULT_WINDOW, max_size=DEFAULT_MAX_SIZE, deduplicator=None):
+    """
+    Yields the `(frame, timestamp)` pairs of all frames which are not duplicates.
+    Pass a `FrameDeduplicator` as `deduplicator` to read its counters afterwards.
+    """
+    if deduplicator is None:
+        deduplicator = FrameDeduplicator(window, max_size)
+    feed = deduplicator.feed
+
+    if timestamps is None:
+        for frame in frames:
+            if feed(frame):
+                yield frame, None
+    else:
+        for frame, timestamp in zip(frames, timestamps):
+            if feed(frame, timestamp):
+                yield frame, timestamp
+
+
+def pair_acknowledgements(telegrams):
+    """
+    Yields `(telegram, acknowledgement)` tuples, where `acknowledgement` is the
+    `KnxAcknowledgementTelegram` directly following `telegram`, or None.
+    Acknowledgements without a telegram before them are yielded as `(None, acknowledgement)`.
+    """
+    pending = None
+    for telegram in telegrams:
+        if isinstance(telegram, KnxAcknowledgementTelegram):
+            yield pending, telegram
+            pending = None
+        else:
+            if pending is not None:
+                yield pending, None
+            pending = telegram
+
+    if pending is not None:
+        yield pending, None
@@ -0,0 +1,239 @@
+"""
+Decoding of group values according to their datapoint type (DPT).
+
+`parse_payload_data` returns the value of `A_GROUP_VALUE_WRITE` and `A_GROUP_VALUE_RESPONSE` telegrams
+as raw unsigned integer. `decode_dpt` converts such a raw value for a given DPT, e.g. `'9.001'`, and
+`DptMapping` does so for telegrams, based on the DPT configured for their group address.
+
+DPTs are written as `'<main>.<sub>'`, `'<main>'` or in the ETS notation `'DPST-<main>-<sub>'`/`'DPT-<main>'`.
+Decoders registered for a subtype take precedence over the one of its main type.
+The vectorized counterpart for columnar data is `columnar.decode_dpt_column`.
+"""
+from datetime import date, time
+from struct import Struct
+
+from .state import GROUP_VALUE_APCIS, _group_address
+
+FLOAT32 = Struct('>f')
+
+DPT_DECODERS = {}
+
+
+def normalize_dpt(dpt):
+    """
+    Returns `dpt` as `'<main>.<sub>'` with a three digit subtype, or as `'<main>'`
+    """
+    if isinstance(dpt, int):
+        return str(dpt)
+
+    dpt = dpt.strip().upper()
+    if dpt.startswith('DPST-') or dpt.startswith('DPT-'):
+        parts = dpt.split('-')[1:]
+    else:
+        parts = dpt.split('.')
+
+    if len(parts) == 1:
+        return str(int(parts[0]))
+    elif len(parts) == 2:
+        return '{}.{:03d}'.format(int(parts[0]), int(parts[1]))
+    raise ValueError("Invalid datapoint type {!r}".format(dpt))
+
+
+def dpt_decoder(*dpts, decoders=DPT_DECODERS):
+    """
+    Registers the decorated function as decoder of the given datapoint types in `decoders`
+    """
+    def register(func):
+        for dpt in dpts:
+            decoders[normalize_dpt(dpt)] = func
+        return func
+    return register
+
+
+def get_dpt_decoder(dpt, decoders=DPT_DECODERS):
+    dpt = normalize_dpt(dpt)
+    decoder = decoders.get(dpt)
+    if decoder is None:
+        decoder = decoders.get(dpt.split('.')[0])
+    if decoder is None:
+        raise NotImplementedError("Datapoint type {} is not supported".format(dpt))
+    return decoder
+
+
+def decode_dpt(dpt, value):
+    """
+    Decodes the raw group value `value` as datapoint type `dpt`
+    """
+    if value is None:
+        return None
+    return get_dpt_decoder(dpt)(value)
+
+
+def _signed(value, bits):
+    return value - (1 << bits) if value & (1 << bits - 1) else value
+
+
+@dpt_decoder(1)
+def _decode_boolean(value):
+    return bool(value & 0b1)
+
+
+@dpt_decoder(2)
+def _decode_boolean_control(value):
+    # (control, value)
+    return bool(value & 0b10), bool(value & 0b1)
+
+
+@dpt_decoder(3)
+def _decode_dimming_control(value):
+    # (increase, step code)
+    return bool(value & 0b1000), value & 0b111
+
+
+@dpt_decoder(4)
+def _decode_character(value):
+    return chr(value & 0xFF)
+
+
+@dpt_decoder(5, '5.004', '5.010')
+def _decode_unsigned_8(value):
+    return value & 0xFF
+
+
+@dpt_decoder('5.001')
+def _decode_scaling(value):
+    return (value & 0xFF) * 100 / 255
+
+
+@dpt_decoder('5.003')
+def _decode_angle(value):
+    return (value & 0xFF) * 360 / 255
+
+
+@dpt_decoder(6)
+def _decode_signed_8(value):
+    return _signed(value & 0xFF, 8)
+
+
+@dpt_decoder(7)
+def _decode_unsigned_16(value):
+    return value & 0xFFFF
+
+
+@dpt_decoder(8)
+def _decode_signed_16(value):
+    return _signed(value & 0xFFFF, 16)
+
+
+@dpt_decoder(9)
+def _decode_float_16(value):
+    if value & 0xFFFF == 0x7FFF:
+        # invalid data
+        return None
+    mantissa = value & 0x07FF
+    if value & 0x8000:
+        mantissa -= 0x0800
+    return 0.01 * mantissa * (1 << (value >> 11 & 0b1111))
+
+
+@dpt_decoder(10)
+def _decode_time(value):
+    # the day of week in the upper 3 bits is dropped
+    return time(value >> 16 & 0b11111, value >> 8 & 0b111111, value & 0b111111)
+
+
+@dpt_decoder(11)
+def _decode_date(value):
+    year = value & 0b1111111
+    return date(year + 2000 if year < 90 else year + 1900, value >> 8 & 0b1111, value >> 16 & 0b11111)
+
+
+@dpt_decoder(12)
+def _decode_unsigned_32(value):
+    return value & 0xFFFFFFFF
+
+
+@dpt_decoder(13)
+def _decode_signed_32(value):
+    return _signed(value & 0xFFFFFFFF, 32)
+
+
+@dpt_decoder(14)
+def _decode_float_32(value):
+    return FLOAT32.unpack((value & 0xFFFFFFFF).to_bytes(4, 'big'))[0]
+
+
+@dpt_decoder(16)
+def _decode_string(value):
+    return value.to_bytes(14, 'big').rstrip(b'\x00').decode('latin-1')
+
+
+@dpt_decoder(17)
+def _decode_scene_number(value):
+    return value & 0b111111
+
+
+@dpt_decoder(18)
+def _decode_scene_control(value):
+    # (learn, scene number)
+    return bool(value & 0b10000000), value & 0b111111
+
+
+class DptMapping(object):
+    """
+    Datapoint types of group addresses, used to decode the values of group telegrams.
+    `mapping` is a dict of group addresses (`KnxAddress`, `'2/3/4'` or raw 16 bit value) to DPTs.
+    """
+
+    def __init__(self, mapping=None):
+        self._decoders = {}
+        self._dpts = {}
+        if mapping is not None:
+            for address, dpt in mapping.items():
+                self[address] = dpt
+
+    def __setitem__(self, address, dpt):
+        address = _group_address(address)
+        self._decoders[address] = get_dpt_decoder(dpt)
+        self._dpts[address] = normalize_dpt(dpt)
+
+    def __getitem__(self, address):
+        return self._dpts[_group_address(address)]
+
+    def __delitem__(self, address):
+        address = _group_address(address)
+        del self._decoders[address]
+        del self._dpts[address]
+
+    def __contains__(self, address):
+        return _group_address(address) in self._dpts
+
+    def __len__(self):
+        return len(self._dpts)
+
+    def items(self):
+        return self._dpts.items()
+
+    def get(self, address, default=None):
+        return self._dpts.get(_group_address(address), default)
+
+    def decode(self, telegram, default=None):
+        """
+        Returns the decoded value of a group telegram, or `default` if the telegram carries
+        no group value or its address is not mapped
+        """
+        if getattr(telegram, 'apci', None) not in GROUP_VALUE_APCIS:
+            return default
+        decoder = self._decoders.get(telegram.dest)
+        if decoder is None or telegram.payload_data is None:
+            return default
+        return decoder(telegram.payload_data)
+
+    def decode_many(self, telegrams, default=None):
+        """
+        Yields `(telegram, value)` tuples
+        """
+        decode = self.decode
+        for telegram in telegrams:
+            yield telegram, decode(telegram, default)
+
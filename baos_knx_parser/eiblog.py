@@ -0,0 +1,240 @@
+"""
+Streaming ingestion of eiblog files.
+
+An eiblog file is a tab separated log with one telegram per line::
+
+    00:04:01	2012-02-27	3.2.50	2/3/4	00800C7E	2900BCC0323213040200800C7E
+
+The file is read in chunks of roughly `chunk_size` bytes. The frames of a chunk are decoded
+in one go and handed as one batch to a sink, so memory stays bounded regardless of the file size.
+"""
+import csv
+from binascii import Error as HexError, unhexlify
+from datetime import datetime
+from itertools import accumulate
+
+from .errors import FrameError, INVALID_HEX
+from .parser import parse_knx_stream
+
+DEFAULT_CHUNK_SIZE = 1 << 20  # bytes
+TELEGRAM_VECTOR_COLUMNS = ('timestamp', 'src', 'dest', 'telegram_type', 'repeat', 'ack',
+                           'priority', 'confirm', 'hop_count', 'apci', 'tpci',
+                           'packet_number', 'payload_length', 'payload', 'payload_data')
+
+
+class TimestampParser(object):
+    """
+    Parses the fixed format `HH:MM:SS` and `YYYY-MM-DD` columns of an eiblog line.
+    The date part is parsed once per date, the last timestamp is reused for lines logged in the same second.
+    """
+
+    def __init__(self):
+        self._dates = {}
+        self._last_time = None
+        self._last_date = None
+        self._last = None
+
+    def __call__(self, time, date):
+        if time == self._last_time and date == self._last_date:
+            return self._last
+
+        try:
+            year, month, day = self._dates[date]
+        except KeyError:
+            year, month, day = self._dates[date] = int(date[0:4]), int(date[5:7]), int(date[8:10])
+
+        self._last_time = time
+        self._last_date = date
+        self._last = datetime(year, month, day, int(time[0:2]), int(time[3:5]), int(time[6:8]))
+        return self._last
+
+
+def iter_eiblog_chunks(file, chunk_size=DEFAULT_CHUNK_SIZE, start=0, end=None, on_error=None):
+    """
+    Reads an eiblog file in chunks and yields `(timestamps, buffer, offsets)` per chunk.
+
+    `buffer` holds all frames of the chunk back to back, `offsets` the start of every frame,
+    ready for `parser.parse_knx_stream` or `columnar.parse_knx_stream_columns`.
+    Only the lines in the byte range `start` to `end` are read, both have to be at line boundaries.
+    Frames, which are not valid hex, raise a `ValueError`, or are skipped and passed to `on_error` as
+    `FrameError`, if given.
+    """
+    parse_timestamp = TimestampParser()
+
+    with open(file, 'rb') as log:
+        log.seek(start)
+        for lines in _iter_line_chunks(log, chunk_size, end - start if end is not None else None):
+            timestamps = []
+            frames = []
+            invalid = 0
+            for line in lines:
+                row = line.rstrip(b'\r').split(b'\t')
+                if len(row) < 6:
+                    # skip empty or incomplete lines
+                    continue
+
+                timestamp = parse_timestamp(row[0], row[1])
+                try:
+                    # every cell on its own, an odd length cell would shift all following frames
+                    frame = unhexlify(row[5])
+                except HexError as e:
+                    if on_error is None:
+                        raise ValueError('Invalid frame {!r} in eiblog line {!r}: {}'.format(row[5], line, e))
+                    invalid += 1
+                    on_error(FrameError(INVALID_HEX, bytes(row[5]), timestamp, str(e)))
+                    continue
+
+                timestamps.append(timestamp)
+                frames.append(frame)
+
+            count_frames = getattr(on_error, 'count_frames', None)
+            if invalid and count_frames is not None:
+                count_frames(invalid)
+
+            if not frames:
+                continue
+
+            offsets = [0]
+            offsets.extend(accumulate(len(frame) for frame in frames[:-1]))
+            yield timestamps, b''.join(frames), offsets
+
+
+def _iter_line_chunks(log, chunk_size, remaining=None):
+    # reads `chunk_size` bytes at a time and yields the complete lines in them,
+    # a partial line at the end is carried over to the next chunk
+    carry = b''
+    while remaining is None or remaining > 0:
+        data = log.read(chunk_size if remaining is None else min(chunk_size, remaining))
+        if not data:
+            break
+        if remaining is not None:
+            remaining -= len(data)
+
+        lines = (carry + data).split(b'\n')
+        carry = lines.pop()
+        yield lines
+
+    if carry:
+        yield [carry]
+
+
+def ingest_eiblog(file, sink, columnar=False, chunk_size=DEFAULT_CHUNK_SIZE, start=0, end=None, on_error=None):
+    """
+    Decodes an eiblog file chunk by chunk and writes every batch to `sink`.
+
+    `sink` is either a callable, which gets called with every batch, or an object with
+    `write(batch)` and `close()` methods, like the sinks in this module.
+    A batch is a list of telegrams, or a `(columns, buffer)` tuple if `columnar` is set (requires numpy).
+    `start` and `end` limit the ingestion to a byte range, see `iter_eiblog_chunks`.
+    With `on_error` set, malformed frames are reported to it instead of raising (for `columnar` only
+    frames, which are not valid hex), see `parser.parse_knx_telegrams`.
+    Returns the sink.
+    """
+    if columnar:
+        from .columnar import parse_knx_stream_columns
+
+    if not hasattr(sink, 'write'):
+        sink = CallbackSink(sink)
+
+    try:
+        for timestamps, buffer, offsets in iter_eiblog_chunks(file, chunk_size, start, end, on_error):
+            if columnar:
+                batch = parse_knx_stream_columns(buffer, offsets, timestamps)
+            else:
+                batch = list(parse_knx_stream(buffer, offsets, timestamps, on_error=on_error))
+
+            sink.write(batch)
+    finally:
+        sink.close()
+
+    return sink
+
+
+class CallbackSink(object):
+    """
+    Calls `callback` with every batch
+    """
+
+    def __init__(self, callback):
+        self.callback = callback
+
+    def write(self, batch):
+        self.callback(batch)
+
+    def close(self):
+        pass
+
+
+class ListSink(object):
+    """
+    Collects all telegrams in `telegrams`
+    """
+
+    def __init__(self):
+        self.telegrams = []
+
+    def write(self, batch):
+        self.telegrams.extend(batch)
+
+    def close(self):
+        pass
+
+
+class ColumnSink(object):
+    """
+    Collects columnar batches. `result()` returns all of them merged into one `(columns, buffer)` tuple.
+    """
+
+    def __init__(self):
+        self._batches = []
+
+    def write(self, batch):
+        self._batches.append(batch)
+
+    def close(self):
+        pass
+
+    def result(self):
+        import numpy as np
+        from .columnar import TELEGRAM_DTYPE
+
+        if not self._batches:
+            return np.zeros(0, dtype=TELEGRAM_DTYPE), b''
+
+        columns = np.concatenate([columns for columns, _ in self._batches])
+        # rebase the payload offsets onto the joined buffer
+        position = 0
+        row = 0
+        for batch_columns, buffer in self._batches:
+            columns['payload_offset'][row:row + len(batch_columns)] += position
+            position += len(buffer)
+            row += len(batch_columns)
+
+        return columns, b''.join(bytes(buffer) for _, buffer in self._batches)
+
+
+class CsvSink(object):
+    """
+    Writes one tab separated row per telegram with the attributes given in `columns`
+    """
+
+    def __init__(self, file, columns=TELEGRAM_VECTOR_COLUMNS):
+        self._file = open(file, 'w', newline='')
+        self._writer = csv.writer(self._file, delimiter='\t')
+        self.columns = columns
+        self._writer.writerow(columns)
+
+    def write(self, batch):
+        columns = self.columns
+        self._writer.writerows(
+            [_csv_value(getattr(telegram, column, None)) for column in columns] for telegram in batch
+        )
+
+    def close(self):
+        self._file.close()
+
+
+def _csv_value(value):
+    if isinstance(value, (bytes, memoryview)):
+        return value.hex()
+    return value
@@ -0,0 +1,65 @@
+"""
+Error records of the tolerant parsing mode.
+
+Instead of raising, the tolerant functions in `parser` report malformed frames as `FrameError` records,
+classified by `kind`. `FrameErrorCollector` is a side channel counting them.
+"""
+from collections import Counter, deque, namedtuple
+
+# kinds of malformed frames
+TRUNCATED = 'truncated'
+UNKNOWN_MSG_CODE = 'unknown_msg_code'
+UNSUPPORTED_APCI = 'unsupported_apci'
+LENGTH_MISMATCH = 'length_mismatch'
+INVALID_HEX = 'invalid_hex'  # a frame in a text log, which is not an even number of hex digits
+INVALID_ACKNOWLEDGEMENT = 'invalid_acknowledgement'  # a busmon acknowledgement, which is no ACK/NACK/BUSY
+
+ERROR_KINDS = (TRUNCATED, UNKNOWN_MSG_CODE, UNSUPPORTED_APCI, LENGTH_MISMATCH, INVALID_HEX, INVALID_ACKNOWLEDGEMENT)
+
+FrameError = namedtuple('FrameError', ('kind', 'frame', 'timestamp', 'message'))
+
+
+class FrameErrorCollector(object):
+    """
+    Counts the errors passed to it and keeps the last `max_records` of them.
+    Pass it as `on_error` to `parser.parse_knx_telegrams`, which also reports the number of frames
+    it processed, so error rates can be computed.
+    """
+
+    def __init__(self, max_records=1000):
+        self.counts = Counter()
+        self.records = deque(maxlen=max_records)
+        self.frames = 0
+
+    def __call__(self, error):
+        self.counts[error.kind] += 1
+        self.records.append(error)
+
+    def count_frames(self, frames):
+        self.frames += frames
+
+    @property
+    def errors(self):
+        return sum(self.counts.values())
+
+    @property
+    def error_rate(self):
+        return self.errors / self.frames if self.frames else 0.0
+
+    def report(self):
+        """
+        Returns the number of frames and errors and the rate of every kind of error as dict
+        """
+        frames = self.frames
+        return {
+            'frames': frames,
+            'errors': self.errors,
+            'error_rate': self.error_rate,
+            'counts': {kind: self.counts[kind] for kind in ERROR_KINDS},
+            'rates': {kind: self.counts[kind] / frames if frames else 0.0 for kind in ERROR_KINDS},
+        }
+
+    def clear(self):
+        self.counts.clear()
+        self.records.clear()
+        self.frames = 0
@@ -0,0 +1,121 @@
+"""
+Filters testing raw cEMI frames, before they are parsed.
+
+`compile_filter` turns a set of conditions into a function `match(binary) -> bool`, which only reads
+the CTRL, CTRLE/NPCI, address and APCI bytes at their fixed offsets. No objects are created for
+frames which do not match, so rejecting a frame is a lot cheaper than parsing it.
+"""
+from .const import APCI, TelegramPriority, TelegramType, is_control_tpdu
+from .knx import KnxAddress
+
+
+def _address_keys(addresses, group):
+    keys = set()
+    for address in addresses:
+        if isinstance(address, str):
+            address = KnxAddress(address, group=group)
+        elif not isinstance(address, KnxAddress):
+            address = KnxAddress.from_int(int(address), group)
+        keys.add(int(address) | 0x10000 if address.group else int(address))
+    return frozenset(keys)
+
+
+def _apci_codes(apcis):
+    # every 10 bit code which decodes to one of the given APCIs
+    members = set(APCI(apci) for apci in apcis)
+    return frozenset(code for code, member in enumerate(APCI._value_table) if member in members)
+
+
+def compile_filter(src_in=None, dest_in=None, apci_in=None, priority_in=None, telegram_type_in=None,
+                   src_area=None, src_line=None, acknowledgements=False):
+    """
+    Compiles the given conditions into a function `match(binary) -> bool` for L_Data.ind (0x29) and
+    L_Busmon.ind (0x2B) frames. All conditions are optional and have to match all.
+
+    `src_in` and `dest_in` are collections of addresses (`KnxAddress`, string or raw value; strings and
+    raw values are physical for `src_in` and group addresses for `dest_in`). `apci_in`, `priority_in` and
+    `telegram_type_in` take enum members, names or values. `src_area` and `src_line` test the parts of the
+    physical source address. Busmon acknowledgement frames match only if `acknowledgements` is set.
+    Control TPDUs carry no APCI, so they never match `apci_in`.
+    Frames with other message codes or too short for their TPDU never match.
+    """
+    srcs = _address_keys(src_in, False) if src_in is not None else None
+    dests = _address_keys(dest_in, True) if dest_in is not None else None
+    apcis = _apci_codes(apci_in) if apci_in is not None else None
+    priorities = frozenset(int(TelegramPriority(priority)) for priority in priority_in) if priority_in is not None else None
+    telegram_types = frozenset(int(TelegramType(telegram_type)) for telegram_type in telegram_type_in) \
+        if telegram_type_in is not None else None
+    test_src = srcs is not None or src_area is not None or src_line is not None
+
+    def match(binary):
+        if len(binary) < 2:
+            return False
+        msg_code = binary[0]
+        k = binary[1] + 2  # start of the KNX frame
+        length = len(binary) - k
+        if msg_code == 0x29:
+            # CTRL, CTRLE, src, dest, length, TPCI
+            if length < 8:
+                return False
+            npci = binary[k + 1]
+            address = k + 2
+            payload = k + 7
+        elif msg_code == 0x2B and length > 1 and not binary[k] & 0b11000000:
+            # extended frames on the bus are laid out like L_Data.ind
+            if length < 8:
+                return False
+            npci = binary[k + 1]
+            address = k + 2
+            payload = k + 7
+        elif msg_code == 0x2B:
+            if length == 1:
+                return acknowledgements
+            # CTRL, src, dest, NPCI, TPCI
+            if length < 7:
+                return False
+            npci = binary[k + 5]
+            address = k + 1
+            payload = k + 6
+        else:
+            return False
+
+        # control TPDUs consist of the TPCI alone, all others carry the APCI in the next byte
+        control = is_control_tpdu(binary[payload])
+        if not control and len(binary) < payload + 2:
+            return False
+
+        ctrl = binary[k]
+        if priorities is not None and ctrl >> 2 & 0b11 not in priorities:
+            return False
+        if telegram_types is not None and ctrl >> 6 not in telegram_types:
+            return False
+
+        if test_src:
+            src = binary[address] << 8 | binary[address + 1]
+            if srcs is not None and src not in srcs:
+                return False
+            if src_area is not None and src >> 12 != src_area:
+                return False
+            if src_line is not None and src >> 8 & 0b1111 != src_line:
+                return False
+
+        if dests is not None:
+            dest = binary[address + 2] << 8 | binary[address + 3]
+            if (dest | 0x10000 if npci & 0b10000000 else dest) not in dests:
+                return False
+
+        if apcis is not None and (control or (binary[payload] & 0b11) << 8 | binary[payload + 1] not in apcis):
+            return False
+
+        return True
+
+    return match
+
+
+def filter_frames(frames, match, timestamps=None):
+    """
+    Yields the `(frame, timestamp)` pairs of all frames accepted by `match`
+    """
+    if timestamps is None:
+        return ((frame, None) for frame in frames if match(frame))
+    return ((frame, timestamp) for frame, timestamp in zip(frames, timestamps) if match(frame))
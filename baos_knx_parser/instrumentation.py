@@ -0,0 +1,233 @@
+"""
+Optional profiling of the parser.
+
+`enable()` replaces the stage functions the parser looks up at runtime (frame decoders, telegram
+construction, address interning, enum lookups and payload decoding) with timing wrappers, `disable()`
+restores them. While disabled the parser runs the original functions, so instrumentation costs nothing.
+
+Stage times are inclusive: the `frame` stage contains all other stages, `telegram` contains the
+`enum` lookups done while constructing the telegram.
+`snapshot()` returns all counters and histograms as plain dicts, ready to be exported.
+"""
+from collections import Counter
+from contextlib import contextmanager
+from time import perf_counter_ns
+from types import SimpleNamespace
+
+from . import knx, parser
+from .const import APCI, is_control_tpdu
+
+STAGES = ('frame', 'telegram', 'address', 'enum', 'payload_data')
+
+
+class Histogram(object):
+    """
+    Histogram with power of two buckets: bucket `i` counts the values `v` with `2 ** (i - 1) <= v < 2 ** i`
+    """
+
+    BUCKETS = 64
+
+    __slots__ = ('count', 'total', 'min', 'max', 'buckets')
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self.count = 0
+        self.total = 0
+        self.min = None
+        self.max = None
+        self.buckets = [0] * self.BUCKETS
+
+    def record(self, value):
+        self.count += 1
+        self.total += value
+        if self.min is None or value < self.min:
+            self.min = value
+        if self.max is None or value > self.max:
+            self.max = value
+        self.buckets[min(int(value).bit_length(), self.BUCKETS - 1)] += 1
+
+    @property
+    def mean(self):
+        return self.total / self.count if self.count else None
+
+    def percentile(self, percentile):
+        """
+        Returns the upper bound of the bucket holding the given percentile (0-100), or None if empty
+        """
+        if not self.count:
+            return None
+        rank = self.count * percentile / 100
+        seen = 0
+        for i, count in enumerate(self.buckets):
+            seen += count
+            if seen >= rank and count:
+                return min(1 << i, self.max)
+        return self.max
+
+    def snapshot(self):
+        return {
+            'count': self.count,
+            'total': self.total,
+            'min': self.min,
+            'max': self.max,
+            'mean': self.mean,
+            'buckets': {1 << i: count for i, count in enumerate(self.buckets) if count},
+        }
+
+
+class ParserStats(object):
+    """
+    Counters and timing histograms (in ns) collected while instrumentation is enabled
+    """
+
+    def __init__(self):
+        self.stages = {stage: Histogram() for stage in STAGES}
+        self.frames = Counter()  # by message code
+        self.apci_times = {}  # APCI name -> Histogram of the frame decode time
+        self.unsupported_msg_codes = Counter()
+        self.unsupported_apcis = Counter()  # by APCI name, or by the code of invalid APCIs
+
+    def reset(self):
+        for histogram in self.stages.values():
+            histogram.reset()
+        self.frames.clear()
+        self.apci_times.clear()
+        self.unsupported_msg_codes.clear()
+        self.unsupported_apcis.clear()
+
+    def record_apci(self, apci, duration):
+        histogram = self.apci_times.get(apci)
+        if histogram is None:
+            histogram = self.apci_times[apci] = Histogram()
+        histogram.record(duration)
+
+    def snapshot(self):
+        return {
+            'stages': {stage: histogram.snapshot() for stage, histogram in self.stages.items()},
+            'frames': {hex(msg_code): count for msg_code, count in self.frames.items()},
+            'apci': {apci: histogram.snapshot() for apci, histogram in self.apci_times.items()},
+            'errors': {
+                'unsupported_msg_code': {hex(msg_code): count for msg_code, count in self.unsupported_msg_codes.items()},
+                'unsupported_apci': dict(self.unsupported_apcis),
+            },
+        }
+
+
+STATS = ParserStats()
+
+_originals = {}
+
+
+def _timed(func, histogram):
+    def timed(*args, **kwargs):
+        start = perf_counter_ns()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            histogram.record(perf_counter_ns() - start)
+    return timed
+
+
+def _timed_frame(func, stats):
+    histogram = stats.stages['frame']
+    value_table = APCI._value_table
+
+    def timed(binary, timestamp=None):
+        start = perf_counter_ns()
+        try:
+            return func(binary, timestamp)
+        finally:
+            duration = perf_counter_ns() - start
+            histogram.record(duration)
+            length = len(binary)
+            if length:
+                stats.frames[binary[0]] += 1
+
+            # attribute the frame to its APCI, read from the raw frame to not disturb the other stages
+            k = binary[1] + 2 if length > 1 else length
+            if length > k:
+                # only standard frames on the bus carry the NPCI in front of the TPDU, all others a length byte
+                p = k + (6 if binary[0] == 0x2B and binary[k] & 0b11000000 else 7)
+                if length > p + 1 and not is_control_tpdu(binary[p]):
+                    code = (binary[p] & 0b11) << 8 | binary[p + 1]
+                    apci = value_table[code]
+                    if apci is None:
+                        # not a valid APCI at all, the parser raises a ValueError
+                        stats.unsupported_apcis[hex(code)] += 1
+                    stats.record_apci(str(apci) if apci is not None else 'UNKNOWN', duration)
+    return timed
+
+
+def _counting_msg_code(func, stats):
+    def unsupported_msg_code(msg_code):
+        stats.unsupported_msg_codes[msg_code] += 1
+        return func(msg_code)
+    return unsupported_msg_code
+
+
+def _counting_apci(func, stats):
+    def unsupported_apci(apci):
+        stats.unsupported_apcis[str(apci)] += 1
+        return func(apci)
+    return unsupported_apci
+
+
+def _wrappers(stats):
+    stages = stats.stages
+    yield parser, 'parse_data_ind', lambda func: _timed_frame(func, stats)
+    yield parser, 'parse_busmon_ind', lambda func: _timed_frame(func, stats)
+    for name in ('KnxStandardTelegram', 'KnxExtendedTelegram', 'KnxAcknowledgementTelegram'):
+        yield parser, name, lambda func: _timed(func, stages['telegram'])
+    yield parser, 'KnxAddress', lambda cls: SimpleNamespace(from_int=_timed(cls.from_int, stages['address']))
+    for name in ('TelegramType', 'TelegramPriority', 'APCI', 'TPCI'):
+        yield knx, name, lambda func: _timed(func, stages['enum'])
+    yield parser, 'parse_payload_data', lambda func: _timed(func, stages['payload_data'])
+    yield parser, 'unsupported_msg_code', lambda func: _counting_msg_code(func, stats)
+    yield parser, 'unsupported_apci', lambda func: _counting_apci(func, stats)
+
+
+def is_enabled():
+    return bool(_originals)
+
+
+def enable(stats=STATS):
+    """
+    Starts collecting into `stats`
+    """
+    if _originals:
+        return
+    for module, name, wrap in _wrappers(stats):
+        original = getattr(module, name)
+        _originals[module, name] = original
+        setattr(module, name, wrap(original))
+
+
+def disable():
+    """
+    Stops collecting and restores the original parser functions
+    """
+    for (module, name), original in _originals.items():
+        setattr(module, name, original)
+    _originals.clear()
+
+
+@contextmanager
+def instrumented(stats=STATS):
+    """
+    Enables instrumentation within a `with` block
+    """
+    enable(stats)
+    try:
+        yield stats
+    finally:
+        disable()
+
+
+def snapshot():
+    return STATS.snapshot()
+
+
+def reset():
+    STATS.reset()
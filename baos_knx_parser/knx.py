@@ -1,30 +1,76 @@
 
+import time
 from datetime import datetime
 
-from . import struct  # precompiled bitstructs
 from .const import TelegramType, TelegramPriority, APCI, TPCI, TelegramAcknowledgement
+from .constructor import construct_telegram
 
 
 class KnxAddress(object):
+    """
+    Physical or group address, backed by its raw 16 bit value.
+
+    Addresses are immutable and interned: creating the same address twice returns the same object.
+    """
     PHYSICAL_DELIMITER = '.'
     GROUP_DELIMITER = '/'
 
-    def __init__(self, str=None, area=None, line=None, device=None, group=False):
+    __slots__ = ('_value', '_group')
+
+    def __new__(cls, str=None, area=None, line=None, device=None, group=False):
 
         if str and (area or line or device):
             raise TypeError("Either set the address as string or as separated fields. Not both")
 
         if str:
             segments = str.split(KnxAddress.PHYSICAL_DELIMITER if not group else KnxAddress.GROUP_DELIMITER)
-            self.area = segments[0]
-            self.line = segments[1]
-            self.device = segments[2]
+            area, line, device = (int(segment) for segment in segments)
+        else:
+            area, line, device = int(area or 0), int(line or 0), int(device or 0)
+
+        if not group:
+            if not (0 <= area < 16 and 0 <= line < 16 and 0 <= device < 256):
+                raise ValueError("{}.{}.{} is not a valid physical address".format(area, line, device))
+            value = area << 12 | line << 8 | device
         else:
-            self.area = area
-            self.line = line
-            self.device = device
+            if not (0 <= area < 32 and 0 <= line < 8 and 0 <= device < 256):
+                raise ValueError("{}/{}/{} is not a valid group address".format(area, line, device))
+            value = area << 11 | line << 8 | device
+
+        return cls.from_int(value, group)
+
+    @classmethod
+    def from_int(cls, value, group=False):
+        # validated before the lookup, out of range values would hit the keys of group addresses
+        if not 0 <= value <= 0xFFFF:
+            raise ValueError("{} is not a valid 16 bit address".format(value))
+
+        key = value | 0x10000 if group else value
+        try:
+            return _ADDRESS_CACHE[key]
+        except KeyError:
+            pass
+
+        address = super(KnxAddress, cls).__new__(cls)
+        address._value = value
+        address._group = bool(group)
+        return _ADDRESS_CACHE.setdefault(key, address)
+
+    @property
+    def group(self):
+        return self._group
+
+    @property
+    def area(self):
+        return self._value >> 11 if self._group else self._value >> 12
+
+    @property
+    def line(self):
+        return self._value >> 8 & 0b111 if self._group else self._value >> 8 & 0b1111
 
-        self.group = group
+    @property
+    def device(self):
+        return self._value & 0xFF
 
     def __repr__(self):
         return "KnxAddress('{str}', group={group})".format(str=str(self), group=self.group)
@@ -36,48 +82,190 @@ class KnxAddress(object):
         )
 
     def __int__(self):
-        bin_addr = self.to_binary()
-        integer, = struct.STD_U16.unpack(bin_addr)
-        return integer
+        return self._value
 
     def __float__(self):
-        return float(self.__int__())
+        return float(self._value)
 
     def __eq__(self, value):
         if not isinstance(value, KnxAddress):
             return False
 
-        return self.group == value.group and self.area == value.area and self.line == value.line and self.device == value.device
+        return self._value == value._value and self._group == value._group
+
+    def __hash__(self):
+        return self._value | 0x10000 if self._group else self._value
+
+    def __reduce__(self):
+        return KnxAddress.from_int, (self._value, self._group)
+
+    def __copy__(self):
+        return self
+
+    def __deepcopy__(self, memo):
+        return self
 
     def to_binary(self):
-        if not self.group:
-            return struct.KNX_ADDR_PHYSICAL.pack(self.area, self.line, self.device)
-        else:
-            return struct.KNX_ADDR_GROUP.pack(self.area, self.line, self.device)
+        return self._value.to_bytes(2, 'big')
 
     def is_group_address(self):
-        return self.group
+        return self._group
 
     def is_physical_address(self):
-        return not self.group
+        return not self._group
+
+
+# interned addresses, key is the raw value with bit 16 set for group addresses
+_ADDRESS_CACHE = {}
+
+
+# flags of a telegram, packed into one int
+_FLAG_TYPE = 0b00000011
+_FLAG_PRIORITY = 0b00001100
+_FLAG_REPEAT = 0b00010000
+_FLAG_ACK = 0b00100000
+_FLAG_CONFIRM = 0b01000000
+
+_TELEGRAM_TYPES = TelegramType._value_table
+_TELEGRAM_PRIORITIES = TelegramPriority._value_table
+
+
+def _enum_value(enum, value):
+    # raw 2 bit values are taken as they are, everything else goes through the enum
+    if value.__class__ is int and 0 <= value <= 0b11:
+        return value
+    return int(enum(value))
+
+
+def datetime_to_ns(timestamp):
+    """
+    Converts a timestamp to ns since the epoch (UTC).
+
+    Aware `datetime`s are converted from their time zone, naive ones are taken as local time (like
+    `datetime.timestamp()` does). Floats are seconds since the epoch (like `time.time()`), ints are ns already.
+    """
+    if isinstance(timestamp, datetime):
+        return round(timestamp.timestamp() * 1000000) * 1000
+    if isinstance(timestamp, float):
+        return round(timestamp * 1000000) * 1000
+    return int(timestamp)
+
+
+def ns_to_datetime(timestamp_ns):
+    return datetime.fromtimestamp(timestamp_ns // 1000000000).replace(microsecond=timestamp_ns // 1000 % 1000000)
 
 
 class KnxBaseTelegram(object):
+    """
+    Base of all data telegrams.
+
+    The flags are packed into one int and served as enum members on access. The timestamp is stored as int
+    nanoseconds since the epoch, a `datetime` or float (seconds) is converted when set, see `datetime_to_ns`.
+    `timestamp` returns it as naive, local `datetime` (the time zone of an aware one is not kept),
+    `timestamp_ns` as it is. It defaults to the current time.
+    """
+
+    __slots__ = ('_timestamp', '_flags', 'src', 'dest', 'hop_count')
 
     def __init__(self, telegram_type=TelegramType.DATA, repeat=False, ack=False, priority=TelegramPriority.NORMAL, confirm=True, src=None, dest=None, hop_count=0, timestamp=None):
-        self.timestamp = timestamp if timestamp else datetime.now()
-        self.telegram_type = TelegramType(telegram_type)
-        self.repeat = repeat
-        self.ack = ack
-        self.priority = TelegramPriority(priority)
-        self.confirm = confirm
+        self.timestamp = timestamp
+        self._flags = _enum_value(TelegramType, telegram_type) | _enum_value(TelegramPriority, priority) << 2 \
+            | (_FLAG_REPEAT if repeat else 0) | (_FLAG_ACK if ack else 0) | (_FLAG_CONFIRM if confirm else 0)
         self.src = src
         self.dest = dest
         self.hop_count = hop_count
 
     def __repr__(self):
         return """KnxExtendedTelegram(src='{src}', dest='{dest}', telegram_type={tt},
-    repeat={repeat}, ack={ack}, priority={prio}, hop_count={hop_count}, timestamp={timestamp})""".format(tt=repr(self.telegram_type), prio=repr(self.priority), **self.__dict__)
+    repeat={repeat}, ack={ack}, priority={prio}, hop_count={hop_count}, timestamp={timestamp})""".format(
+            src=self.src, dest=self.dest, tt=repr(self.telegram_type), repeat=self.repeat, ack=self.ack,
+            prio=repr(self.priority), hop_count=self.hop_count, timestamp=self.timestamp)
+
+    @property
+    def timestamp(self):
+        return ns_to_datetime(self._timestamp)
+
+    @timestamp.setter
+    def timestamp(self, timestamp):
+        if timestamp is None:
+            timestamp = time.time_ns()
+        elif timestamp.__class__ is not int:
+            timestamp = datetime_to_ns(timestamp)
+        self._timestamp = timestamp
+
+    @property
+    def timestamp_ns(self):
+        return self._timestamp
+
+    def _set_flag(self, flag, value):
+        self._flags = self._flags | flag if value else self._flags & ~flag
+
+    @property
+    def telegram_type(self):
+        return _TELEGRAM_TYPES[self._flags & _FLAG_TYPE]
+
+    @telegram_type.setter
+    def telegram_type(self, telegram_type):
+        self._flags = self._flags & ~_FLAG_TYPE | _enum_value(TelegramType, telegram_type)
+
+    @property
+    def priority(self):
+        return _TELEGRAM_PRIORITIES[(self._flags & _FLAG_PRIORITY) >> 2]
+
+    @priority.setter
+    def priority(self, priority):
+        self._flags = self._flags & ~_FLAG_PRIORITY | _enum_value(TelegramPriority, priority) << 2
+
+    @property
+    def repeat(self):
+        return bool(self._flags & _FLAG_REPEAT)
+
+    @repeat.setter
+    def repeat(self, repeat):
+        self._set_flag(_FLAG_REPEAT, repeat)
+
+    @property
+    def ack(self):
+        return bool(self._flags & _FLAG_ACK)
+
+    @ack.setter
+    def ack(self, ack):
+        self._set_flag(_FLAG_ACK, ack)
+
+    @property
+    def confirm(self):
+        return bool(self._flags & _FLAG_CONFIRM)
+
+    @confirm.setter
+    def confirm(self, confirm):
+        self._set_flag(_FLAG_CONFIRM, confirm)
+
+    def __copy__(self):
+        return _copy_slots(self)
+
+    def __getstate__(self):
+        # the (dict, slots) state pickle expects for slotted classes, object.__getstate__ is Python 3.11+ only
+        slot_state = {}
+        for name in _slot_names(self.__class__):
+            try:
+                slot_state[name] = object.__getattribute__(self, name)
+            except AttributeError:
+                pass
+
+        if isinstance(slot_state.get('payload'), memoryview):
+            # views into the frame can not be pickled, store copies
+            slot_state['payload'] = bytes(slot_state['payload'])
+            if isinstance(slot_state.get('payload_data'), list):
+                slot_state['payload_data'] = [bytes(value) if isinstance(value, memoryview) else value
+                                              for value in slot_state['payload_data']]
+        return getattr(self, '__dict__', None) or None, slot_state
+
+    def freeze(self):
+        """
+        Makes the telegram immutable by switching it to its frozen class. Returns the telegram.
+        """
+        self.__class__ = _FROZEN_CLASSES[self.__class__]
+        return self
 
     @property
     def tpdu(self):
@@ -88,27 +276,28 @@ class KnxBaseTelegram(object):
 
     @property
     def apci(self):
-        if not self.payload:
+        if len(self.payload) < 2:
+            # control TPDUs have no APCI
             return None
 
-        apci_num, = struct.KNX_APCI.unpack(self.payload[0:3])
-        return APCI(apci_num)
+        # see struct.KNX_APCI
+        return APCI((self.payload[0] & 0b11) << 8 | self.payload[1])
 
     @property
     def tpci(self):
         if not self.payload:
             return None
 
-        tpci_num, = struct.KNX_TPCI.unpack(self.payload[0:2])
-        return TPCI(tpci_num)
+        # see struct.KNX_TPCI
+        return TPCI(self.payload[0] >> 6)
 
     @property
     def packet_number(self):
         if not self.payload:
             return None
 
-        count, = struct.KNX_PACKET_NUMBER.unpack(self.payload[0:2])
-        return count
+        # see struct.KNX_PACKET_NUMBER
+        return self.payload[0] >> 2 & 0b1111
 
     @property
     def packet_count(self):
@@ -123,10 +312,12 @@ class KnxBaseTelegram(object):
 
 class KnxStandardTelegram(KnxBaseTelegram):
 
+    __slots__ = ('payload', 'payload_length', 'payload_data')
+
     def __init__(self, payload_length=None, payload=bytes(), *args, **kwargs):
         super(KnxStandardTelegram, self).__init__(*args, **kwargs)
 
-        if payload_length is not None and not len(payload) == payload_length - 2:
+        if payload_length is not None and not len(payload) == payload_length + 2:
             raise TypeError("Payload length mismatch")
 
         self.payload = payload
@@ -138,61 +329,130 @@ class KnxStandardTelegram(KnxBaseTelegram):
         return """KnxStandardTelegram(src='{src}', dest='{dest}', telegram_type={tt},
     repeat={repeat}, ack={ack}, priority={prio}, hop_count={hop_count}, timestamp='{timestamp}',
     payload_length={payload_length}, payload=payload=bytes.fromhex('{p}')), payload_data={payload_data}"""\
-            .format(tt=repr(self.telegram_type), prio=repr(self.priority), p=p, **self.__dict__)
+            .format(src=self.src, dest=self.dest, tt=repr(self.telegram_type), repeat=self.repeat, ack=self.ack,
+                    prio=repr(self.priority), hop_count=self.hop_count, timestamp=self.timestamp,
+                    payload_length=self.payload_length, p=p, payload_data=self.payload_data)
 
     def to_binary(self):
-        binary = b''.join((
-            struct.CEMI_MSG_CODE.pack(0x29),  # cEMI header
-            struct.CEMI_ADD_LEN.pack(0),  # no additional cEMI/BAOS info here, since they are not stored in the KNX Datamodel
-            struct.KNX_CTRL.pack(int(self.telegram_type), not self.repeat, 3, int(self.priority), not self.ack, not self.confirm),
-            struct.KNX_CTRLE.pack(self.dest.group, self.hop_count, 0),
-            self.src.to_binary(),
-            self.dest.to_binary(),
-            struct.KNX_LENGTH.pack(self.payload_length),
-            self.payload,
-            self.payload_data,
-        ))
-
-        return binary
+        return construct_telegram(self)
 
 
 class KnxExtendedTelegram(KnxBaseTelegram):
 
-    def __init__(self, eff=bytes(), payload_length=None, payload=bytes(), *args, **kwargs):
+    __slots__ = ('eff', 'payload', 'payload_length', 'payload_data')
+
+    def __init__(self, eff=0, payload_length=None, payload=bytes(), *args, **kwargs):
         super(KnxExtendedTelegram, self).__init__(*args, **kwargs)
         self.eff = eff
 
-        if payload_length is not None and not len(payload) == payload_length - 2:
+        if payload_length is not None and not len(payload) == payload_length + 2:
             raise TypeError("Payload length mismatch")
 
         self.payload = payload
+        self.payload_data = None
         self.payload_length = payload_length if payload_length is not None else len(payload) - 2
 
     def __repr__(self):
-        eff = hex(self.eff)
         p = self.payload.hex()
         return """KnxExtendedTelegram(src='{src}', dest='{dest}', telegram_type={tt},
     repeat={repeat}, ack={ack}, priority={prio}, hop_count={hop_count}, timestamp='{timestamp}',
-    eff=bytes.fromhex('{eff_hex}'), payload_length={payload_length}, payload=bytes.fromhex('{p}'))""".format(tt=repr(self.telegram_type), prio=repr(self.priority), p=p, eff_hex=eff, **self.__dict__)
+    eff={eff_hex}, payload_length={payload_length}, payload=bytes.fromhex('{p}'), payload_data={payload_data})""".format(
+            src=self.src, dest=self.dest, tt=repr(self.telegram_type), repeat=self.repeat, ack=self.ack,
+            prio=repr(self.priority), hop_count=self.hop_count, timestamp=self.timestamp, eff_hex=hex(self.eff),
+            payload_length=self.payload_length, p=p, payload_data=self.payload_data)
 
     def to_binary(self):
-        binary = b''.join((
-            struct.CEMI_MSG_CODE.pack(0x29),  # cEMI header
-            struct.CEMI_ADD_LEN.pack(0),  # no additional cEMI/BAOS info here, since they are not stored in the KNX Datamodel
-            struct.KNX_CTRL.pack(int(self.telegram_type), not self.repeat, 3, int(self.priority), not self.ack, not self.confirm),
-            struct.KNX_CTRLE.pack(self.dest.group, self.hop_count, self.eff),
-            self.src.to_binary(),
-            self.dest.to_binary(),
-            struct.KNX_LENGTH.pack(self.payload_length),
-            self.payload,
-        ))
-
-        return binary
+        return construct_telegram(self)
+
 
 class KnxAcknowledgementTelegram(object):
 
+    __slots__ = ('acknowledgement', )
+
     def __init__(self, acknowledgement=TelegramAcknowledgement.ACK):
         self.acknowledgement = TelegramAcknowledgement(acknowledgement)
 
     def __repr__(self):
-        return """KnxAcknowledgementTelegram(ack='{0}')""".format(repr(self.acknowledgement))
\ No newline at end of file
+        return """KnxAcknowledgementTelegram(ack='{0}')""".format(repr(self.acknowledgement))
+
+    def __copy__(self):
+        return _copy_slots(self)
+
+    def freeze(self):
+        """
+        Makes the telegram immutable by switching it to its frozen class. Returns the telegram.
+        """
+        self.__class__ = _FROZEN_CLASSES[self.__class__]
+        return self
+
+    def to_binary(self):
+        return construct_telegram(self)
+
+
+class FrozenTelegram(object):
+    """
+    Mixin of the immutable telegram classes, see `freeze()`
+    """
+
+    __slots__ = ()
+
+    def __setattr__(self, name, value):
+        raise AttributeError("{} is frozen".format(self.__class__.__name__))
+
+    def __delattr__(self, name):
+        raise AttributeError("{} is frozen".format(self.__class__.__name__))
+
+    def __setstate__(self, state):
+        # unpickling has to bypass __setattr__
+        dict_state, slot_state = state if isinstance(state, tuple) else (state, None)
+        for state in (dict_state, slot_state):
+            for name, value in (state or {}).items():
+                object.__setattr__(self, name, value)
+
+    def __copy__(self):
+        return self
+
+    def freeze(self):
+        return self
+
+
+class FrozenKnxStandardTelegram(FrozenTelegram, KnxStandardTelegram):
+    __slots__ = ()
+
+
+class FrozenKnxExtendedTelegram(FrozenTelegram, KnxExtendedTelegram):
+    __slots__ = ()
+
+
+class FrozenKnxAcknowledgementTelegram(FrozenTelegram, KnxAcknowledgementTelegram):
+    __slots__ = ()
+
+
+_FROZEN_CLASSES = {
+    KnxStandardTelegram: FrozenKnxStandardTelegram,
+    KnxExtendedTelegram: FrozenKnxExtendedTelegram,
+    KnxAcknowledgementTelegram: FrozenKnxAcknowledgementTelegram,
+}
+
+# names of all slots of a class, including the ones of its bases
+_SLOT_NAMES = {}
+
+
+def _slot_names(cls):
+    names = _SLOT_NAMES.get(cls)
+    if names is None:
+        names = _SLOT_NAMES[cls] = tuple(name for klass in cls.__mro__ for name in klass.__dict__.get('__slots__', ()))
+    return names
+
+
+def _copy_slots(telegram):
+    cls = telegram.__class__
+    copy = cls.__new__(cls)
+    for name in _slot_names(cls):
+        try:
+            object.__setattr__(copy, name, object.__getattribute__(telegram, name))
+        except AttributeError:
+            pass
+    if hasattr(telegram, '__dict__'):
+        copy.__dict__.update(telegram.__dict__)
+    return copy
\ No newline at end of file
@@ -0,0 +1,161 @@
+"""
+Response times of read services.
+
+`LatencyMatcher` pairs every read request (e.g. A_GROUP_VALUE_READ, A_PROPERTY_VALUE_READ) with the first
+matching response in a stream of telegrams. Pending requests are kept in a table indexed by the expected
+response, so every telegram costs a few dict operations. Requests, which are not answered within the
+timeout, are counted as unanswered.
+"""
+from collections import Counter, OrderedDict
+from datetime import timedelta
+
+from .const import APCI
+from .instrumentation import Histogram
+from .knx import KnxAddress
+
+DEFAULT_TIMEOUT = timedelta(seconds=3)
+DEFAULT_MAX_PENDING = 4096
+
+# request -> response
+READ_SERVICES = {
+    APCI(APCI.A_GROUP_VALUE_READ): APCI(APCI.A_GROUP_VALUE_RESPONSE),
+    APCI(APCI.A_INDIVIDUAL_ADDRESS_READ): APCI(APCI.A_INDIVIDUAL_ADDRESS_RESPONSE),
+    APCI(APCI.A_INDIVIDUAL_ADDRESS_SERIAL_NUMBER_READ): APCI(APCI.A_INDIVIDUAL_ADDRESS_SERIAL_NUMBER_RESPONSE),
+    APCI(APCI.A_DOMAIN_ADDRESS_READ): APCI(APCI.A_DOMAIN_ADDRESS_RESPONSE),
+    APCI(APCI.A_DOMAIN_ADDRESS_SELECTIVE_READ): APCI(APCI.A_DOMAIN_ADDRESS_RESPONSE),
+    APCI(APCI.A_PROPERTY_VALUE_READ): APCI(APCI.A_PROPERTY_VALUE_RESPONSE),
+    APCI(APCI.A_PROPERTY_DESCRIPTION_READ): APCI(APCI.A_PROPERTY_DESCRIPTION_RESPONSE),
+    APCI(APCI.A_USER_MEMORY_READ): APCI(APCI.A_USER_MEMORY_RESPONSE),
+    APCI(APCI.A_USER_MANUFACTURE_INFO_READ): APCI(APCI.A_USER_MANUFACTURE_INFO_RESPONSE),
+    APCI(APCI.A_ADC_READ): APCI(APCI.A_ADC_RESPONSE),
+    APCI(APCI.A_MEMORY_READ): APCI(APCI.A_MEMORY_RESPONSE),
+    APCI(APCI.A_DEVICE_DESCRIPTOR_READ): APCI(APCI.A_DEVICE_DESCRIPTOR_RESPONSE),
+    APCI(APCI.A_NETWORK_PARAMETER_READ): APCI(APCI.A_NETWORK_PARAMETER_RESPONSE),
+    APCI(APCI.A_LINK_READ): APCI(APCI.A_LINK_RESPONSE),
+}
+
+
+def _services(value_table):
+    # APCI code -> (is request, service name, name of the response), for every 10 bit APCI code
+    responses = set(READ_SERVICES.values())
+    services = [None] * len(value_table)
+    for code, apci in enumerate(value_table):
+        if apci in READ_SERVICES:
+            services[code] = (True, str(apci), str(READ_SERVICES[apci]))
+        elif apci in responses:
+            services[code] = (False, None, str(apci))
+    return tuple(services)
+
+
+_SERVICES = _services(APCI._value_table)
+
+
+class LatencyMatcher(object):
+    """
+    Measures the time (in ns) from read requests to their responses, in a stream of telegrams with
+    increasing timestamps.
+
+    Requests to a group address are answered by any device responding to that group address, requests to
+    an individual address only by the addressed device. A repeated request does not restart the
+    measurement. At most `max_pending` requests wait for a response, the oldest ones are dropped on overflow.
+    """
+
+    def __init__(self, timeout=DEFAULT_TIMEOUT, max_pending=DEFAULT_MAX_PENDING):
+        self.timeout_ns = timeout // timedelta(microseconds=1) * 1000
+        self.max_pending = max_pending
+        self.pending = OrderedDict()  # (response, dest group, requester, responder) -> (ns, service)
+        self.services = {}  # service -> Histogram
+        self.devices = {}  # responding individual address (int) -> Histogram
+        self.requests = Counter()  # by service
+        self.unanswered = Counter()  # by service, timed out or dropped
+        self.unmatched = Counter()  # responses without a pending request, by response
+
+    def expire(self, now):
+        """
+        Drops all requests older than `now` - timeout (ns since the epoch)
+        """
+        pending = self.pending
+        deadline = now - self.timeout_ns
+        while pending:
+            sent, service = next(iter(pending.values()))
+            if sent >= deadline:
+                break
+            pending.popitem(last=False)
+            self.unanswered[service] += 1
+
+    def update(self, telegram):
+        """
+        Feeds one telegram, everything but read requests and their responses is ignored
+        """
+        payload = getattr(telegram, 'payload', None)
+        if payload is None or len(payload) < 2 or payload[0] & 0b10000000 or telegram.repeat:
+            # acknowledgements, control TPDUs and link layer repetitions
+            return
+
+        # see struct.KNX_APCI
+        service = _SERVICES[(payload[0] & 0b11) << 8 | payload[1]]
+        if service is None:
+            return
+
+        now = telegram.timestamp_ns
+        self.expire(now)
+
+        request, name, response = service
+        src = int(telegram.src)
+        dest = telegram.dest
+        pending = self.pending
+        if request:
+            key = (response, int(dest), None, None) if dest.group else (response, None, src, int(dest))
+            self.requests[name] += 1
+            if key not in pending:
+                if len(pending) >= self.max_pending:
+                    self.unanswered[pending.popitem(last=False)[1][1]] += 1
+                pending[key] = (now, name)
+            return
+
+        key = (response, int(dest), None, None) if dest.group else (response, None, int(dest), src)
+        entry = pending.pop(key, None)
+        if entry is None:
+            self.unmatched[response] += 1
+            return
+
+        sent, name = entry
+        latency = now - sent
+        histogram = self.services.get(name)
+        if histogram is None:
+            histogram = self.services[name] = Histogram()
+        histogram.record(latency)
+        histogram = self.devices.get(src)
+        if histogram is None:
+            histogram = self.devices[src] = Histogram()
+        histogram.record(latency)
+
+    def update_many(self, telegrams):
+        update = self.update
+        for telegram in telegrams:
+            update(telegram)
+
+    def device(self, address):
+        """
+        Returns the latency histogram of the device with the individual address `address` (`KnxAddress` or str)
+        """
+        return self.devices.get(int(address if isinstance(address, KnxAddress) else KnxAddress(address)))
+
+    def snapshot(self):
+        return {
+            'pending': len(self.pending),
+            'requests': dict(self.requests),
+            'unanswered': dict(self.unanswered),
+            'unmatched': dict(self.unmatched),
+            'services': {name: histogram.snapshot() for name, histogram in self.services.items()},
+            'devices': {str(KnxAddress.from_int(address)): histogram.snapshot()
+                        for address, histogram in self.devices.items()},
+        }
+
+    def clear(self):
+        self.pending.clear()
+        self.services.clear()
+        self.devices.clear()
+        self.requests.clear()
+        self.unanswered.clear()
+        self.unmatched.clear()
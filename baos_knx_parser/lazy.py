@@ -0,0 +1,175 @@
+from . import struct
+from .const import TelegramType, TelegramPriority, is_control_tpdu
+from .knx import KnxAddress, KnxBaseTelegram
+from .parser import parse_knx_telegram, parse_payload_data
+
+
+def parse_knx_telegram_lazy(binary, timestamp=None):
+    """
+    Like `parse_knx_telegram`, but returns a `LazyKnxTelegram`, which decodes its fields only on access.
+    Acknowledgement frames are small enough to be parsed right away.
+    """
+    if not isinstance(binary, (bytes, memoryview)):
+        binary = memoryview(binary)
+
+    msg_code = binary[0]
+    if msg_code == 0x29:
+        return LazyKnxTelegram(binary, timestamp)
+    elif msg_code == 0x2B:
+        if len(binary) - binary[1] - 2 == 1:
+            # handle ACK telegram
+            return parse_knx_telegram(binary, timestamp)
+        return LazyKnxTelegram(binary, timestamp)
+    else:
+        raise TypeError("Can only parse L_Data.ind (0x29) and L_Busmon.ind (0x2B) at the moment, but got {}".format(hex(msg_code)))
+
+
+class cached_field(object):
+    """
+    Decodes a field on first access and stores the result in the instance, so the decoder runs only once.
+    """
+
+    def __init__(self, func):
+        self.func = func
+        self.name = func.__name__
+        self.__doc__ = func.__doc__
+
+    def __get__(self, instance, owner):
+        if instance is None:
+            return self
+
+        value = instance.__dict__[self.name] = self.func(instance)
+        return value
+
+
+class LazyKnxTelegram(KnxBaseTelegram):
+    """
+    View over a L_Data.ind (0x29) or L_Busmon.ind (0x2B) frame.
+
+    Offers the same attributes as `KnxStandardTelegram`/`KnxExtendedTelegram`, but every field
+    is decoded on first access and cached afterwards.
+    """
+
+    def __init__(self, binary, timestamp=None):
+        self.timestamp = timestamp
+        self._binary = binary
+        self._busmon = binary[0] == 0x2B
+        self._offset = binary[1] + 2  # start of the KNX frame, behind the additional info
+        # standard frames on the bus carry the NPCI behind the addresses, all others a CTRLE in front of them
+        self._npci_layout = self._busmon and binary[self._offset] >> 6 != TelegramType.EXT
+
+    def __repr__(self):
+        return """LazyKnxTelegram(src='{src}', dest='{dest}', telegram_type={tt},
+    repeat={repeat}, ack={ack}, priority={prio}, hop_count={hop_count}, timestamp='{timestamp}',
+    payload_length={payload_length}, payload=bytes.fromhex('{p}'))""".format(
+            src=self.src, dest=self.dest, tt=repr(self.telegram_type), repeat=self.repeat, ack=self.ack,
+            prio=repr(self.priority), hop_count=self.hop_count, timestamp=self.timestamp,
+            payload_length=self.payload_length, p=self.payload.hex())
+
+    @cached_field
+    def _ctrl(self):
+        return struct.KNX_CTRL.unpack(self._binary[self._offset:self._offset + 1])
+
+    @cached_field
+    def _npci(self):
+        # CTRLE or NPCI, both start with address type and hop count
+        if self._npci_layout:
+            return struct.KNX_NPCI.unpack(self._binary[self._offset + 5:self._offset + 6])
+        else:
+            return struct.KNX_CTRLE.unpack(self._binary[self._offset + 1:self._offset + 2])
+
+    @cached_field
+    def telegram_type(self):
+        return TelegramType(self._ctrl[0])
+
+    @cached_field
+    def repeat(self):
+        return not self._ctrl[1]  # repeated flag is send inverted
+
+    @cached_field
+    def priority(self):
+        return TelegramPriority(self._ctrl[3])
+
+    @cached_field
+    def ack(self):
+        return not self._ctrl[4]  # acknowledge request flag is send inverted
+
+    @cached_field
+    def confirm(self):
+        return not self._ctrl[5]  # if `not confirm_flag` => error
+
+    @cached_field
+    def hop_count(self):
+        return self._npci[1]
+
+    @cached_field
+    def eff(self):
+        if self._npci_layout:
+            return None
+        return self._npci[2]
+
+    @cached_field
+    def src(self):
+        start = self._offset + (1 if self._npci_layout else 2)
+        return KnxAddress.from_int(self._binary[start] << 8 | self._binary[start + 1])
+
+    @cached_field
+    def dest(self):
+        start = self._offset + (3 if self._npci_layout else 4)
+        return KnxAddress.from_int(self._binary[start] << 8 | self._binary[start + 1], self._npci[0])
+
+    @cached_field
+    def payload_length(self):
+        if is_control_tpdu(self._binary[self._offset + (6 if self._npci_layout else 7)]):
+            # control TPDUs consist of the TPCI alone
+            return -1
+        elif self._npci_layout:
+            return self._npci[2] - 1
+        elif self._busmon:
+            # the length byte of extended frames on the bus counts the TPDU without TPCI
+            return self._binary[self._offset + 6] - 1
+        else:
+            return self._binary[self._offset + 6]
+
+    @cached_field
+    def payload(self):
+        start = self._offset + (6 if self._npci_layout else 7)
+        binary = self._binary
+        if binary[self._offset] >> 6 == TelegramType.EXT and not isinstance(binary, memoryview):
+            # long payloads of extended frames are handed out as views, not copies
+            binary = memoryview(binary)
+        return binary[start:start + 2 + self.payload_length]
+
+    @cached_field
+    def payload_data(self):
+        if is_control_tpdu(self.payload[0]):
+            # control TPDUs carry no APDU
+            return None
+        return parse_payload_data(self.apci, self.payload, self.payload_length)
+
+    @cached_field
+    def apci(self):
+        return super(LazyKnxTelegram, self).apci
+
+    @cached_field
+    def tpci(self):
+        return super(LazyKnxTelegram, self).tpci
+
+    @cached_field
+    def packet_number(self):
+        return super(LazyKnxTelegram, self).packet_number
+
+    def to_telegram(self):
+        """
+        Decodes the whole frame into a `KnxStandardTelegram` or `KnxExtendedTelegram`
+        """
+        return parse_knx_telegram(self._binary, self.timestamp)
+
+    def freeze(self):
+        """
+        Decodes the whole frame into an immutable telegram
+        """
+        return self.to_telegram().freeze()
+
+    def to_binary(self):
+        return self.to_telegram().to_binary()
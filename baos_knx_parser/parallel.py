@@ -0,0 +1,63 @@
+"""
+Parallel decoding of eiblog files on multiple cores.
+
+The file is split at line boundaries into byte ranges, which are decoded into columns
+by a pool of worker processes. Workers return compact `(columns, buffer)` batches, no telegram objects.
+The batches are merged in file order, which is timestamp order for eiblog files, so the result
+is identical to a sequential `ingest_eiblog(file, ColumnSink(), columnar=True).result()`.
+
+This module requires numpy.
+"""
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from .eiblog import DEFAULT_CHUNK_SIZE, ColumnSink, ingest_eiblog
+
+DEFAULT_RANGE_SIZE = 16 << 20  # bytes
+
+
+def split_eiblog(file, range_size=DEFAULT_RANGE_SIZE):
+    """
+    Splits a file into `(start, end)` byte ranges of roughly `range_size` bytes, ending at line boundaries.
+    """
+    size = os.path.getsize(file)
+    ranges = []
+
+    with open(file, 'rb') as log:
+        start = 0
+        while start < size:
+            log.seek(min(start + range_size, size))
+            log.readline()  # move to the end of the current line
+            end = min(log.tell(), size)
+            ranges.append((start, end))
+            start = end
+
+    return ranges
+
+
+def decode_eiblog_range(file, start, end, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Decodes the lines in the byte range `start` to `end` into a `(columns, buffer)` tuple
+    """
+    return ingest_eiblog(file, ColumnSink(), columnar=True, chunk_size=chunk_size, start=start, end=end).result()
+
+
+def decode_eiblog_parallel(file, workers=None, range_size=DEFAULT_RANGE_SIZE, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Decodes an eiblog file into one `(columns, buffer)` tuple using `workers` processes
+    (defaults to the number of CPUs). Each worker decodes ranges of `range_size` bytes,
+    reading `chunk_size` bytes at a time.
+    """
+    ranges = split_eiblog(file, range_size)
+    merged = ColumnSink()
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        # map returns the batches in the order of the ranges
+        for batch in executor.map(decode_eiblog_range,
+                                  [file] * len(ranges),
+                                  [start for start, _ in ranges],
+                                  [end for _, end in ranges],
+                                  [chunk_size] * len(ranges)):
+            merged.write(batch)
+
+    return merged.result()
@@ -1,222 +1,523 @@
 
-from . import struct
-from .const import TelegramType, APCI
+from itertools import chain, islice, repeat
+
+from .const import TelegramType, TelegramAcknowledgement, APCI, is_control_tpdu
+from .errors import FrameError, TRUNCATED, UNKNOWN_MSG_CODE, UNSUPPORTED_APCI, LENGTH_MISMATCH, \
+    INVALID_ACKNOWLEDGEMENT
 from .knx import KnxAddress, KnxExtendedTelegram, KnxStandardTelegram, KnxAcknowledgementTelegram
 
 def parse_knx_telegram(binary, timestamp=None):
+    """
+    Parses a single cEMI frame.
+
+    `binary` may be `bytes`, `bytearray`, `memoryview` or `mmap`. Non-bytes inputs are parsed through a
+    `memoryview`, so the payload of the resulting telegram is a view into the original buffer, not a copy.
+    """
+    if not isinstance(binary, (bytes, memoryview)):
+        binary = memoryview(binary)
+
     # check message code
-    msg_code, = struct.CEMI_MSG_CODE.unpack(binary[0:1])
+    msg_code = binary[0]
     if msg_code == 0x29:
         return parse_data_ind(binary, timestamp)
     elif msg_code == 0x2B:
         return parse_busmon_ind(binary, timestamp)
     else:
-        raise TypeError("Can only parse L_Data.ind (0x29) and L_Busmon.ind (0x2B) at the moment, but got {}".format(hex(msg_code)))
+        raise unsupported_msg_code(msg_code)
+
+
+def unsupported_msg_code(msg_code):
+    """
+    Returns the error raised for frames with an unsupported message code
+    """
+    return TypeError("Can only parse L_Data.ind (0x29) and L_Busmon.ind (0x2B) at the moment, but got {}".format(hex(msg_code)))
+
+
+def frame_length(binary, offset=0):
+    """
+    Returns the length of the frame starting at `offset`, computed from the cEMI additional info length
+    and the CTRL/NPCI/length fields, or None if not enough bytes are available to tell.
+    """
+    available = len(binary) - offset
+    if available < 2:
+        return None
+
+    msg_code = binary[offset]
+    header = 2 + binary[offset + 1]
+    k = offset + header  # start of the KNX frame
+    if msg_code == 0x29:
+        if available < header + 8:
+            return None
+        if is_control_tpdu(binary[k + 7]):
+            # CTRL, CTRLE, src, dest, length and TPCI
+            return header + 8
+        # CTRL, CTRLE, src, dest, length and TPCI/APCI, the length counts the data behind them
+        return header + 9 + binary[k + 6]
+    elif msg_code == 0x2B:
+        if available < header + 1:
+            return None
+        if not binary[k] & 0b00010000:
+            # acknowledgements are a single byte, data frames always have this bit of CTRL set
+            return header + 1
+        if not binary[k] & 0b11000000:
+            if available < header + 8:
+                return None
+            # extended frames: CTRL, CTRLE, src, dest, length, TPDU and checksum
+            return header + 9 + (0 if is_control_tpdu(binary[k + 7]) else binary[k + 6])
+        if available < header + 7:
+            return None
+        # CTRL, src, dest, NPCI, TPDU and checksum, the NPCI length counts the TPDU without TPCI
+        return header + 8 + (0 if is_control_tpdu(binary[k + 6]) else binary[k + 5] & 0b1111)
+    else:
+        raise unsupported_msg_code(msg_code)
+
+
+def check_frame(binary):
+    """
+    Checks the message code and the length of a frame without parsing it.
+    Returns the kind of error (see `errors`) of a malformed frame, or None.
+    """
+    if len(binary) < 2:
+        return TRUNCATED
+    msg_code = binary[0]
+    if msg_code != 0x29 and msg_code != 0x2B:
+        return UNKNOWN_MSG_CODE
+
+    length = frame_length(binary)
+    if length is None or len(binary) < length:
+        return TRUNCATED
+    elif len(binary) > length:
+        return LENGTH_MISMATCH
+
+    k = binary[1] + 2
+    if length == k + 1:
+        # busmon acknowledgement
+        if TelegramAcknowledgement._value_table[binary[k]] is None:
+            return INVALID_ACKNOWLEDGEMENT
+        return None
+    if msg_code == 0x29 or not binary[k] & 0b11000000:
+        # extended frames on the bus have a length byte instead of the NPCI, like L_Data.ind
+        count, tpci = binary[k + 6], binary[k + 7]
+    else:
+        count, tpci = binary[k + 5] & 0b1111, binary[k + 6]
+
+    if is_control_tpdu(tpci):
+        # control TPDUs consist of the TPCI alone
+        if count:
+            return LENGTH_MISMATCH
+    elif msg_code == 0x2B and not count:
+        # on the bus, the length has to count the APCI of data TPDUs
+        return LENGTH_MISMATCH
+    return None
+
+
+def parse_knx_telegram_tolerant(binary, timestamp=None):
+    """
+    Like `parse_knx_telegram`, but returns a `FrameError` for malformed frames instead of raising
+    """
+    if not isinstance(binary, (bytes, memoryview)):
+        binary = memoryview(binary)
+
+    kind = check_frame(binary)
+    if kind is not None:
+        return FrameError(kind, bytes(binary), timestamp, None)
+
+    try:
+        if binary[0] == 0x29:
+            return parse_data_ind(binary, timestamp)
+        else:
+            return parse_busmon_ind(binary, timestamp)
+    except (NotImplementedError, ValueError) as e:
+        # no payload decoder, or not a valid APCI at all
+        return FrameError(UNSUPPORTED_APCI, bytes(binary), timestamp, str(e))
+    except IndexError as e:
+        # the APDU is shorter than the fields of its service
+        return FrameError(TRUNCATED, bytes(binary), timestamp, 'APDU too short: {}'.format(e))
+
+
+def parse_knx_telegrams(frames, timestamps=None, frame_filter=None, on_error=None):
+    """
+    Yields one telegram per frame, a convenience wrapper calling `parse_knx_telegram` on every frame.
+    It is not faster than that loop; the frames are still decoded one by one.
+
+    `frames` is an iterable of frames, `timestamps` an optional iterable of the same length.
+    Frames rejected by `frame_filter` (see `filters.compile_filter`) are skipped without parsing them.
+
+    If `on_error` is given, malformed frames do not raise, but are passed to `on_error` as `FrameError`
+    and skipped. If `on_error` has a `count_frames` method, it gets called with the number of parsed
+    frames at the end, see `errors.FrameErrorCollector`.
+    """
+    if timestamps is None:
+        timestamps = repeat(None)
+
+    if on_error is not None:
+        return _parse_knx_telegrams_tolerant(frames, timestamps, frame_filter, on_error)
+
+    return _parse_knx_telegrams(frames, timestamps, frame_filter)
+
+
+def _parse_knx_telegrams(frames, timestamps, frame_filter):
+    for binary, timestamp in zip(frames, timestamps):
+        if not isinstance(binary, (bytes, memoryview)):
+            binary = memoryview(binary)
+        if frame_filter is not None and not frame_filter(binary):
+            continue
+
+        yield parse_knx_telegram(binary, timestamp)
+
+
+def _parse_knx_telegrams_tolerant(frames, timestamps, frame_filter, on_error):
+    count = 0
+    try:
+        for binary, timestamp in zip(frames, timestamps):
+            if not isinstance(binary, (bytes, memoryview)):
+                binary = memoryview(binary)
+            if frame_filter is not None and not frame_filter(binary):
+                continue
+
+            count += 1
+            telegram = parse_knx_telegram_tolerant(binary, timestamp)
+            if telegram.__class__ is FrameError:
+                on_error(telegram)
+            else:
+                yield telegram
+    finally:
+        count_frames = getattr(on_error, 'count_frames', None)
+        if count_frames is not None:
+            count_frames(count)
+
+
+def parse_knx_stream(buffer, offsets, timestamps=None, frame_filter=None, on_error=None):
+    """
+    Parses frames stored back to back in `buffer`.
+
+    `offsets` holds the start offset of every frame; each frame ends where the next one starts,
+    the last one at the end of the buffer.
+    """
+    if not isinstance(buffer, (bytes, memoryview)):
+        # slicing a memoryview does not copy the frames
+        buffer = memoryview(buffer)
+
+    ends = chain(islice(offsets, 1, None), (len(buffer), ))
+    frames = (buffer[start:end] for start, end in zip(offsets, ends))
+    return parse_knx_telegrams(frames, timestamps, frame_filter, on_error)
 
 
 def parse_busmon_ind(binary, timestamp=None):
     telegram = None
-    add_len, = struct.CEMI_ADD_LEN.unpack(binary[1:2])
-    knx_binary = binary[add_len + 2:]
+    add_len = binary[1]
+    k = add_len + 2  # start of the KNX frame. Fields are read by offset, to not copy the frame
 
-    if len(knx_binary) == 1:
+    if len(binary) - k == 1:
         # handle ACK telegram
-        acknowledgement, = struct.KNX_ACK.unpack(knx_binary[0:1])
-        return KnxAcknowledgementTelegram(acknowledgement=acknowledgement)
-
-    # parse CTRL
-    frame_type_flag, repeated_flag, system_broadcast_flag, priority, acknowledge_request_flag, confirm_flag = struct.KNX_CTRL.unpack(knx_binary[0:1])
-    acknowledge_request_flag = not acknowledge_request_flag # acknowledge_request_flag flag is send inverted
-    confirm_flag = not confirm_flag  # if `not confirm_flag` => error
-    repeated_flag = not repeated_flag  # same with repeated_flag flag
+        return KnxAcknowledgementTelegram(acknowledgement=binary[k])
 
-    # parse NPCI
-    destination_address_type, hop_count, payload_length = struct.KNX_NPCI.unpack(knx_binary[5:6])
+    # parse CTRL (see struct.KNX_CTRL)
+    ctrl = binary[k]
+    frame_type_flag = ctrl >> 6
+    repeated_flag = not ctrl & 0b00100000  # repeated flag is send inverted
+    priority = ctrl >> 2 & 0b11
+    acknowledge_request_flag = not ctrl & 0b00000010  # acknowledge_request_flag flag is send inverted
+    confirm_flag = not ctrl & 0b00000001  # if `not confirm_flag` => error
 
     # create data model class
     if frame_type_flag == TelegramType.EXT:
+        # extended frames carry CTRLE and a length byte instead of the NPCI (see struct.KNX_CTRLE)
+        ctrle = binary[k + 1]
+        destination_address_type = ctrle >> 7 == 1
+        hop_count = ctrle >> 4 & 0b111
+        extended_frame_format = ctrle & 0b1111
         telegram = KnxExtendedTelegram(timestamp=timestamp, telegram_type=frame_type_flag, repeat=repeated_flag, ack=acknowledge_request_flag,
-                                       priority=priority, confirm=confirm_flag, hop_count=hop_count)
+                                       priority=priority, confirm=confirm_flag, hop_count=hop_count, eff=extended_frame_format)
+        address = k + 2
+        payload_length = binary[k + 6]
+        payload_start = k + 7
+        if not isinstance(binary, memoryview):
+            # long payloads of extended frames are handed out as views, not copies
+            binary = memoryview(binary)
     else:
+        # parse NPCI (see struct.KNX_NPCI)
+        npci = binary[k + 5]
+        destination_address_type = npci >> 7 == 1
+        hop_count = npci >> 4 & 0b111
         telegram = KnxStandardTelegram(timestamp=timestamp, telegram_type=frame_type_flag, repeat=repeated_flag, ack=acknowledge_request_flag,
                                        priority=priority, confirm=confirm_flag, hop_count=hop_count)
-    
+        address = k + 1
+        payload_length = npci & 0b1111
+        payload_start = k + 6
+
     # parse addresses
-    telegram.src = parse_knx_addr(knx_binary[1:3])
-    telegram.dest = parse_knx_addr(knx_binary[3:5], group=destination_address_type)
+    telegram.src = KnxAddress.from_int(binary[address] << 8 | binary[address + 1])
+    telegram.dest = KnxAddress.from_int(binary[address + 2] << 8 | binary[address + 3], destination_address_type)
 
-    # parse payload
-    telegram.payload_length = payload_length - 1
-    telegram.payload = knx_binary[6:8 + telegram.payload_length]
-    apci = telegram.apci
-    telegram.payload_data = parse_payload_data(apci, knx_binary[6:8 + telegram.payload_length], telegram.payload_length)
+    # parse payload, the length counts the TPDU without TPCI
+    if is_control_tpdu(binary[payload_start]):
+        # control TPDUs (T_CONNECT, T_DISCONNECT, T_ACK, T_NAK) carry no APDU
+        telegram.payload_length = -1
+        telegram.payload = binary[payload_start:payload_start + 1]
+        telegram.payload_data = None
+    else:
+        telegram.payload_length = payload_length - 1
+        telegram.payload = binary[payload_start:payload_start + 2 + telegram.payload_length]
+        telegram.payload_data = parse_payload_data(telegram.apci, telegram.payload, telegram.payload_length)
     return telegram
 
+
 def parse_data_ind(binary, timestamp=None):
     telegram = None
-    add_len, = struct.CEMI_ADD_LEN.unpack(binary[1:2])
-    knx_binary = binary[add_len + 2:]
+    add_len = binary[1]
+    k = add_len + 2  # start of the KNX frame. Fields are read by offset, to not copy the frame
 
-    # parse CTRL
-    frame_type_flag, repeated_flag, system_broadcast_flag, priority, acknowledge_request_flag, confirm_flag = struct.KNX_CTRL.unpack(knx_binary[0:1])
-    acknowledge_request_flag = not acknowledge_request_flag  # acknowledge_request_flag flag is send inverted
-    confirm_flag = not confirm_flag  # if `not confirm_flag` => error
-    repeated_flag = not repeated_flag  # same with repeated_flag flag
+    # parse CTRL (see struct.KNX_CTRL)
+    ctrl = binary[k]
+    frame_type_flag = ctrl >> 6
+    repeated_flag = not ctrl & 0b00100000  # repeated flag is send inverted
+    priority = ctrl >> 2 & 0b11
+    acknowledge_request_flag = not ctrl & 0b00000010  # acknowledge_request_flag flag is send inverted
+    confirm_flag = not ctrl & 0b00000001  # if `not confirm_flag` => error
 
-    # parse CTRLE (it is send anyway in BAOS)
-    destination_address_type, hop_count, extended_frame_format = struct.KNX_CTRLE.unpack(knx_binary[1:2])
+    # parse CTRLE (it is send anyway in BAOS, see struct.KNX_CTRLE)
+    ctrle = binary[k + 1]
+    destination_address_type = ctrle >> 7 == 1
+    hop_count = ctrle >> 4 & 0b111
+    extended_frame_format = ctrle & 0b1111
 
     # create data model class
     if frame_type_flag == TelegramType.EXT:
         telegram = KnxExtendedTelegram(timestamp=timestamp, telegram_type=frame_type_flag, repeat=repeated_flag, ack=acknowledge_request_flag,
                                        priority=priority, confirm=confirm_flag, hop_count=hop_count, eff=extended_frame_format)
+        if not isinstance(binary, memoryview):
+            # long payloads of extended frames are handed out as views, not copies
+            binary = memoryview(binary)
     else:
         telegram = KnxStandardTelegram(timestamp=timestamp, telegram_type=frame_type_flag, repeat=repeated_flag, ack=acknowledge_request_flag,
                                        priority=priority, confirm=confirm_flag, hop_count=hop_count)
 
     # parse addresses
-    telegram.src = parse_knx_addr(knx_binary[2:4])
-    telegram.dest = parse_knx_addr(knx_binary[4:6], group=destination_address_type)
+    telegram.src = KnxAddress.from_int(binary[k + 2] << 8 | binary[k + 3])
+    telegram.dest = KnxAddress.from_int(binary[k + 4] << 8 | binary[k + 5], destination_address_type)
 
     # parse payload
-    telegram.payload_length, = struct.KNX_LENGTH.unpack(knx_binary[6:7])
-    telegram.payload = knx_binary[7:9 + telegram.payload_length]
-    apci = telegram.apci
-    telegram.payload_data = parse_payload_data(apci,knx_binary[7:9 + telegram.payload_length], telegram.payload_length)
+    if is_control_tpdu(binary[k + 7]):
+        # control TPDUs (T_CONNECT, T_DISCONNECT, T_ACK, T_NAK) carry no APDU
+        telegram.payload_length = -1
+        telegram.payload = binary[k + 7:k + 8]
+        telegram.payload_data = None
+    else:
+        telegram.payload_length = binary[k + 6]
+        telegram.payload = binary[k + 7:k + 9 + telegram.payload_length]
+        telegram.payload_data = parse_payload_data(telegram.apci, telegram.payload, telegram.payload_length)
     return telegram
 
 
 def parse_knx_addr(binary, group=False):
-    if group:
-        area, line, device = struct.KNX_ADDR_GROUP.unpack(binary)
-    else:
-        area, line, device = struct.KNX_ADDR_PHYSICAL.unpack(binary)
-    return KnxAddress(area=area, line=line, device=device, group=group)
+    return KnxAddress.from_int(binary[0] << 8 | binary[1], group)
+
+
+# APCI -> decoder(payload_bytes, payload_length), filled by `payload_decoder`
+PAYLOAD_DECODERS = {}
+
+
+def payload_decoder(*apcis):
+    """
+    Registers the decorated function as payload_data decoder for the given APCIs.
+    The decoder is called with the payload (TPCI/APCI included) and the payload length.
+    """
+    def register(decoder):
+        for apci in apcis:
+            PAYLOAD_DECODERS[APCI(apci)] = decoder
+        return decoder
+
+    return register
+
+
+def unsupported_apci(apci):
+    """
+    Returns the error raised for APCIs without payload decoder
+    """
+    return NotImplementedError('Parsing of Payload for {0} not yet implemented!'.format(apci))
 
 
 def parse_payload_data(apci, payload_bytes, payload_length):
-    possible_short_payload = [APCI.A_INDIVIDUAL_ADDRESS_RESPONSE,
-                              APCI.A_GROUP_VALUE_WRITE, APCI.A_GROUP_VALUE_RESPONSE, APCI.A_DEVICE_DESCRIPTOR_READ]
-    no_payload = [APCI.A_GROUP_VALUE_READ, APCI.A_INDIVIDUAL_ADDRESS_READ, APCI.A_DOMAIN_ADDRESS_READ,
-                  APCI.A_USER_MANUFACTURE_INFO_READ, APCI.A_RESTART]
-    individual_address_serial_number_payload = [APCI.A_INDIVIDUAL_ADDRESS_SERIAL_NUMBER_RESPONSE,
-                                                APCI.A_INDIVIDUAL_ADDRESS_SERIAL_NUMBER_WRITE]
-    network_parameter_payload = [APCI.A_NETWORK_PARAMETER_READ, APCI.A_NETWORK_PARAMETER_RESPONSE,
-                                 APCI.A_NETWORK_PARAMETER_WRITE]
-    domain_address_payload = [APCI.A_DOMAIN_ADDRESS_WRITE, APCI.A_DOMAIN_ADDRESS_RESPONSE]
-    property_value_payload = [APCI.A_PROPERTY_VALUE_RESPONSE, APCI.A_PROPERTY_VALUE_WRITE]
-    memory_write_payload = [APCI.A_MEMORY_RESPONSE, APCI.A_MEMORY_WRITE]
-    user_memory_payload = [APCI.A_USER_MEMORY_RESPONSE, APCI.A_USER_MEMORY_WRITE]
-    memory_bit_payload = [APCI.A_MEMORY_BIT_WRITE, APCI.A_USER_MEMORY_BIT_WRITE]
-
-    if apci in possible_short_payload:
-        if payload_length == 0:
-            # Take last 6 Bits of Byte as payload-data
-            payload_data = int(bin(int(payload_bytes[1:2].hex(), 16))[4:10])
-        else:
-            payload_data = int(payload_bytes[2:2 + payload_length].hex(), 16)
-    elif apci in no_payload:
-        payload_data = None
-    elif apci == APCI.A_INDIVIDUAL_ADDRESS_WRITE:
-        payload_data = parse_knx_addr(payload_bytes[2:2 + payload_length])
-    elif apci == APCI.A_INDIVIDUAL_ADDRESS_SERIAL_NUMBER_READ:
-        payload_data = int(payload_bytes[2:2 + payload_length].hex(), 16)
-    elif apci in individual_address_serial_number_payload:
-        # values separated in Serial number, Domain Address/New Address
-        payload_data = [int(payload_bytes[2:8].hex(), 16), parse_knx_addr(payload_bytes[8:9])]
-    elif apci in network_parameter_payload:
-        # values separated in Interface object type, Property-ID, Test_info/Test_info+Test_result/Value
-        payload_data = [int(payload_bytes[2:4].hex(), 16), int(payload_bytes[4:5].hex(), 16),
-                        int(payload_bytes[5:2 + payload_length].hex(), 16)]
-    elif apci == APCI.A_SERVICE_INFORMATION_INDICATION_WRITE:
-        payload_bits = bin(int(payload_bytes[2:3].hex()))
-        # values separated in verify mode, dupl. phys. Addr, appl. stopped
-        payload_data = [payload_bits[5], payload_bits[6], payload_bits[7]]
-    elif apci in domain_address_payload:
-        payload_data = parse_knx_addr(payload_bytes[2:2+payload_length], True)
-    elif apci == APCI.A_DOMAIN_ADDRESS_SELECTIVE_READ:
-        # values separated in domain address, start address, range
-        payload_data = [parse_knx_addr(payload_bytes[2:4], True), parse_knx_addr(payload_bytes[4:6]), payload_bytes[6]]
-    elif apci == APCI.A_PROPERTY_VALUE_READ:
-        payload_bits = bin(int(payload_bytes[4:6].hex(), 16))
-        # values separated in Object_index, Property_id, nr_of_elem, Start_index
-        payload_data = [int(payload_bytes[2:3].hex(), 16), int(payload_bytes[3:4].hex(), 16), int(payload_bits[0:4]),
-                        int(payload_bits[4:])]
-    elif apci in property_value_payload:
-        payload_bits = bin(int(payload_bytes[4:6].hex(), 16))
-        # values separated in Object_index, Property_id, nr_of_elem, Start_index, Data
-        payload_data = [int(payload_bytes[2:3].hex(), 16), int(payload_bytes[3:4].hex(), 16), int(payload_bits[0:4]),
-                        int(payload_bits[4:]), payload_bytes[6:2 + payload_length]]
-    elif apci == APCI.A_PROPERTY_DESCRIPTION_READ:
-        # values separated in Object_index, Property_id, Property_index
-        payload_data = [int(payload_bytes[2:3].hex(), 16), int(payload_bytes[3:4].hex(), 16),
-                        int(payload_bytes[4:5].hex(), 16)]
-    elif apci == APCI.A_PROPERTY_DESCRIPTION_RESPONSE:
-        payload_bits = bin(int(payload_bytes[8:9].hex(), 16))
-        # values separated in Object_index, Property_id, Property_index, Type, max_nr_of_elem,
-        # Access (read_level, write_level)
-        payload_data = [int(payload_bytes[2:3].hex(), 16), int(payload_bytes[3:4].hex(), 16),
-                        int(payload_bytes[4:5].hex(), 16), int(payload_bytes[5:6].hex(), 16),
-                        int(payload_bytes[6:8].hex(), 16), int(payload_bits[0:4]), int(payload_bits[4:])]
-    elif apci == APCI.A_DEVICE_DESCRIPTOR_RESPONSE:
-        # values separated in Descriptor_type, Device descriptor
-        payload_data = [int(bin(int(payload_bytes[1:2].hex(), 16))[4:10]),
-                        int(payload_bytes[2:2 + payload_length].hex(), 16)]
-    elif apci == APCI.A_LINK_READ:
-        # values separated in Group_object_number, Start_index
-        payload_data = [int(payload_bytes[2:3].hex(), 16), int(payload_bytes[3:4].hex(), 16)]
-    elif apci == APCI.A_LINK_RESPONSE:
-        payload_bits = bin(int(payload_bytes[3:4].hex(), 16))
-        # values separated in Group_object_number, Sending_address, Start_address, Group_address_list
-        payload_data = [int(payload_bytes[2:3].hex(), 16), int(payload_bits[0:4]), int(payload_bits[4:]),
-                        int(payload_bytes[4:].hex(), 16)]
-    elif apci == APCI.A_LINK_WRITE:
-        payload_bits = bin(int(payload_bytes[3:4].hex(), 16))
-        # values separated in Group_object_number, d flag, s flag, Group_address
-        payload_data = [int(payload_bytes[2:3].hex(), 16), payload_bits[6:7], payload_bits[7:8],
-                        int(payload_bytes[4:].hex(), 16)]
-    elif apci == APCI.A_ADC_READ:
-        # values separated in Channel_nr, Read_count
-        payload_data = [bin(int(payload_bytes[1:2].hex(), 16))[4:10], int(payload_bytes[2:3].hex(), 16)]
-    elif apci == APCI.A_ADC_RESPONSE:
-        # values separated in Channel_nr, Read_count, Sum of AD_converter_Access
-        payload_data = [bin(int(payload_bytes[1:2].hex(), 16))[4:10], int(payload_bytes[2:3].hex(), 16),
-                        int(payload_bytes[3].hex(), 16)]
-    elif apci == APCI.A_MEMORY_READ:
-        payload_bits = bin(int(payload_bytes[1:2].hex(), 16))[6:10]
-        # values separated in number, address
-        payload_data = [payload_bits, parse_knx_addr(payload_bytes[2:4])]
-    elif apci in memory_write_payload:
-        payload_bits = bin(int(payload_bytes[1:2].hex(), 16))[6:10]
-        # values separated in number, address, Data
-        payload_data = [payload_bits, parse_knx_addr(payload_bytes[2:4]), payload_bytes[4:].hex()]
-    elif apci in memory_bit_payload:
-        number = int(payload_bytes[2:3].hex(), 16)
-        # values separated in number, address, and_data, xor_data
-        payload_data = [number, parse_knx_addr(payload_bytes[3:5]), payload_bytes[5:5 + number].hex(),
-                        payload_bytes[5 + number:2 + 2 * number].hex()]
-    elif apci == APCI.A_USER_MEMORY_READ:
-        payload_bits = bin(int(payload_bytes[2:3].hex(), 16))
-        # values separated in address extension, number, address
-        payload_data = [int(payload_bits[0:4]), int(payload_bits[4:8]), parse_knx_addr(payload_bytes[3:5])]
-    elif apci in user_memory_payload:
-        payload_bits = bin(int(payload_bytes[2:3].hex(), 16))
-        # values separated in address extension, number, address, data
-        payload_data = [int(payload_bits[0:4]), int(payload_bits[4:8]), parse_knx_addr(payload_bytes[3:5]),
-                        payload_bytes[5:].hex()]
-    elif apci == APCI.A_USER_MANUFACTURE_INFO_RESPONSE:
-        # values separated in manufacturer_id, manufacturer specific
-        payload_data = [int(payload_bytes[2:3].hex(), 16), payload_bytes[3:5].hex()]
-    elif apci == APCI.A_AUTHORIZE_REQUEST:
-        # values separated in must be 0, Key
-        payload_data = [int(payload_bytes[2:3].hex(), 16), payload_bytes[3:].hex()]
-    elif apci == APCI.A_AUTHORIZE_RESPONSE:
-        payload_data = int(payload_bytes[2:3].hex(), 16)
-    elif apci == APCI.A_KEY_WRITE:
-        # values separated in level, key
-        payload_data = [int(payload_bytes[2:3].hex(), 16), payload_bytes[3:].hex()]
-    elif apci == APCI.A_KEY_RESPONSE:
-        payload_data = int(payload_bytes[2:3].hex(), 16)
+    if apci.__class__ is not APCI:
+        # raw codes and the Bitmasks of the APCI class
+        apci = APCI(apci)
+    try:
+        decoder = PAYLOAD_DECODERS[apci]
+    except KeyError:
+        raise unsupported_apci(apci)
+
+    return decoder(payload_bytes, payload_length)
+
+
+def _uint(binary):
+    return int.from_bytes(binary, 'big')
+
+
+@payload_decoder(APCI.A_INDIVIDUAL_ADDRESS_RESPONSE, APCI.A_GROUP_VALUE_WRITE, APCI.A_GROUP_VALUE_RESPONSE,
+                 APCI.A_DEVICE_DESCRIPTOR_READ)
+def _decode_possible_short_payload(payload_bytes, payload_length):
+    if payload_length == 0:
+        # Take last 6 Bits of Byte as payload-data
+        return payload_bytes[1] & 0b111111
     else:
-        raise Exception('Parsing of Payload for {0} not yet implemented!'.format(telegram.apci))
-    return payload_data
+        return _uint(payload_bytes[2:2 + payload_length])
+
+
+@payload_decoder(APCI.A_GROUP_VALUE_READ, APCI.A_INDIVIDUAL_ADDRESS_READ, APCI.A_DOMAIN_ADDRESS_READ,
+                 APCI.A_USER_MANUFACTURE_INFO_READ, APCI.A_RESTART)
+def _decode_no_payload(payload_bytes, payload_length):
+    return None
+
+
+@payload_decoder(APCI.A_INDIVIDUAL_ADDRESS_WRITE)
+def _decode_individual_address_write(payload_bytes, payload_length):
+    return parse_knx_addr(payload_bytes[2:4])
+
+
+@payload_decoder(APCI.A_INDIVIDUAL_ADDRESS_SERIAL_NUMBER_READ)
+def _decode_individual_address_serial_number_read(payload_bytes, payload_length):
+    return _uint(payload_bytes[2:2 + payload_length])
+
+
+@payload_decoder(APCI.A_INDIVIDUAL_ADDRESS_SERIAL_NUMBER_RESPONSE, APCI.A_INDIVIDUAL_ADDRESS_SERIAL_NUMBER_WRITE)
+def _decode_individual_address_serial_number(payload_bytes, payload_length):
+    # values separated in Serial number, Domain Address/New Address
+    return [_uint(payload_bytes[2:8]), parse_knx_addr(payload_bytes[8:10])]
+
+
+@payload_decoder(APCI.A_NETWORK_PARAMETER_READ, APCI.A_NETWORK_PARAMETER_RESPONSE, APCI.A_NETWORK_PARAMETER_WRITE)
+def _decode_network_parameter(payload_bytes, payload_length):
+    # values separated in Interface object type, Property-ID, Test_info/Test_info+Test_result/Value
+    return [_uint(payload_bytes[2:4]), payload_bytes[4], _uint(payload_bytes[5:2 + payload_length])]
+
+
+@payload_decoder(APCI.A_SERVICE_INFORMATION_INDICATION_WRITE)
+def _decode_service_information_indication_write(payload_bytes, payload_length):
+    info = payload_bytes[2]
+    # values separated in verify mode, dupl. phys. Addr, appl. stopped
+    return [info >> 2 & 1, info >> 1 & 1, info & 1]
+
+
+@payload_decoder(APCI.A_DOMAIN_ADDRESS_WRITE, APCI.A_DOMAIN_ADDRESS_RESPONSE)
+def _decode_domain_address(payload_bytes, payload_length):
+    return parse_knx_addr(payload_bytes[2:4], True)
+
+
+@payload_decoder(APCI.A_DOMAIN_ADDRESS_SELECTIVE_READ)
+def _decode_domain_address_selective_read(payload_bytes, payload_length):
+    # values separated in domain address, start address, range
+    return [parse_knx_addr(payload_bytes[2:4], True), parse_knx_addr(payload_bytes[4:6]), payload_bytes[6]]
+
+
+@payload_decoder(APCI.A_PROPERTY_VALUE_READ)
+def _decode_property_value_read(payload_bytes, payload_length):
+    # values separated in Object_index, Property_id, nr_of_elem, Start_index
+    return [payload_bytes[2], payload_bytes[3], payload_bytes[4] >> 4, (payload_bytes[4] & 0b1111) << 8 | payload_bytes[5]]
+
+
+@payload_decoder(APCI.A_PROPERTY_VALUE_RESPONSE, APCI.A_PROPERTY_VALUE_WRITE)
+def _decode_property_value(payload_bytes, payload_length):
+    # values separated in Object_index, Property_id, nr_of_elem, Start_index, Data
+    return [payload_bytes[2], payload_bytes[3], payload_bytes[4] >> 4, (payload_bytes[4] & 0b1111) << 8 | payload_bytes[5],
+            payload_bytes[6:2 + payload_length]]
+
+
+@payload_decoder(APCI.A_PROPERTY_DESCRIPTION_READ)
+def _decode_property_description_read(payload_bytes, payload_length):
+    # values separated in Object_index, Property_id, Property_index
+    return [payload_bytes[2], payload_bytes[3], payload_bytes[4]]
+
+
+@payload_decoder(APCI.A_PROPERTY_DESCRIPTION_RESPONSE)
+def _decode_property_description_response(payload_bytes, payload_length):
+    # values separated in Object_index, Property_id, Property_index, Type, max_nr_of_elem,
+    # Access (read_level, write_level)
+    return [payload_bytes[2], payload_bytes[3], payload_bytes[4], payload_bytes[5], _uint(payload_bytes[6:8]),
+            payload_bytes[8] >> 4, payload_bytes[8] & 0b1111]
+
+
+@payload_decoder(APCI.A_DEVICE_DESCRIPTOR_RESPONSE)
+def _decode_device_descriptor_response(payload_bytes, payload_length):
+    # values separated in Descriptor_type, Device descriptor
+    return [payload_bytes[1] & 0b111111, _uint(payload_bytes[2:2 + payload_length])]
+
+
+@payload_decoder(APCI.A_LINK_READ)
+def _decode_link_read(payload_bytes, payload_length):
+    # values separated in Group_object_number, Start_index
+    return [payload_bytes[2], payload_bytes[3]]
+
+
+@payload_decoder(APCI.A_LINK_RESPONSE)
+def _decode_link_response(payload_bytes, payload_length):
+    # values separated in Group_object_number, Sending_address, Start_address, Group_address_list
+    return [payload_bytes[2], payload_bytes[3] >> 4, payload_bytes[3] & 0b1111, _uint(payload_bytes[4:])]
+
+
+@payload_decoder(APCI.A_LINK_WRITE)
+def _decode_link_write(payload_bytes, payload_length):
+    # values separated in Group_object_number, d flag, s flag, Group_address
+    return [payload_bytes[2], payload_bytes[3] >> 1 & 1, payload_bytes[3] & 1, _uint(payload_bytes[4:])]
+
+
+@payload_decoder(APCI.A_ADC_READ)
+def _decode_adc_read(payload_bytes, payload_length):
+    # values separated in Channel_nr, Read_count
+    return [payload_bytes[1] & 0b111111, payload_bytes[2]]
+
+
+@payload_decoder(APCI.A_ADC_RESPONSE)
+def _decode_adc_response(payload_bytes, payload_length):
+    # values separated in Channel_nr, Read_count, Sum of AD_converter_Access
+    return [payload_bytes[1] & 0b111111, payload_bytes[2], _uint(payload_bytes[3:5])]
+
+
+@payload_decoder(APCI.A_MEMORY_READ)
+def _decode_memory_read(payload_bytes, payload_length):
+    # values separated in number, address
+    return [payload_bytes[1] & 0b1111, parse_knx_addr(payload_bytes[2:4])]
+
+
+@payload_decoder(APCI.A_MEMORY_RESPONSE, APCI.A_MEMORY_WRITE)
+def _decode_memory(payload_bytes, payload_length):
+    # values separated in number, address, Data
+    return [payload_bytes[1] & 0b1111, parse_knx_addr(payload_bytes[2:4]), payload_bytes[4:].hex()]
+
+
+@payload_decoder(APCI.A_MEMORY_BIT_WRITE, APCI.A_USER_MEMORY_BIT_WRITE)
+def _decode_memory_bit(payload_bytes, payload_length):
+    number = payload_bytes[2]
+    # values separated in number, address, and_data, xor_data
+    return [number, parse_knx_addr(payload_bytes[3:5]), payload_bytes[5:5 + number].hex(),
+            payload_bytes[5 + number:5 + 2 * number].hex()]
+
+
+@payload_decoder(APCI.A_USER_MEMORY_READ)
+def _decode_user_memory_read(payload_bytes, payload_length):
+    # values separated in address extension, number, address
+    return [payload_bytes[2] >> 4, payload_bytes[2] & 0b1111, parse_knx_addr(payload_bytes[3:5])]
+
+
+@payload_decoder(APCI.A_USER_MEMORY_RESPONSE, APCI.A_USER_MEMORY_WRITE)
+def _decode_user_memory(payload_bytes, payload_length):
+    # values separated in address extension, number, address, data
+    return [payload_bytes[2] >> 4, payload_bytes[2] & 0b1111, parse_knx_addr(payload_bytes[3:5]),
+            payload_bytes[5:].hex()]
+
+
+@payload_decoder(APCI.A_USER_MANUFACTURE_INFO_RESPONSE)
+def _decode_user_manufacture_info_response(payload_bytes, payload_length):
+    # values separated in manufacturer_id, manufacturer specific
+    return [payload_bytes[2], payload_bytes[3:5].hex()]
+
+
+@payload_decoder(APCI.A_AUTHORIZE_REQUEST, APCI.A_KEY_WRITE)
+def _decode_key(payload_bytes, payload_length):
+    # values separated in must be 0/level, Key
+    return [payload_bytes[2], payload_bytes[3:].hex()]
+
+
+@payload_decoder(APCI.A_AUTHORIZE_RESPONSE, APCI.A_KEY_RESPONSE)
+def _decode_level(payload_bytes, payload_length):
+    return payload_bytes[2]
@@ -0,0 +1,115 @@
+from collections import OrderedDict, namedtuple
+from datetime import datetime
+
+from .const import APCI
+from .knx import KnxAddress
+
+# telegrams carrying the value of a group address
+GROUP_VALUE_APCIS = frozenset((APCI(APCI.A_GROUP_VALUE_WRITE), APCI(APCI.A_GROUP_VALUE_RESPONSE)))
+
+GroupState = namedtuple('GroupState', ('value', 'timestamp', 'src'))
+
+
+class GroupStateCache(object):
+    """
+    Current value of every group address, updated incrementally from parsed telegrams.
+
+    Only `A_GROUP_VALUE_WRITE` and `A_GROUP_VALUE_RESPONSE` telegrams update the cache, the stored value
+    is their `payload_data`. Lookups are O(1). With `max_size` set, the least recently updated or
+    looked up address is evicted once the cache is full. With `ttl` (a `timedelta`) set, states older
+    than `ttl` are treated as unknown.
+    """
+
+    def __init__(self, max_size=None, ttl=None):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._states = OrderedDict()
+
+    def update(self, telegram):
+        """
+        Updates the cache from `telegram`. Returns whether the telegram carried a group value.
+        """
+        if getattr(telegram, 'apci', None) not in GROUP_VALUE_APCIS or not telegram.dest.group:
+            return False
+
+        dest = telegram.dest
+        self._states[dest] = GroupState(telegram.payload_data, telegram.timestamp, telegram.src)
+
+        if self.max_size is not None:
+            self._states.move_to_end(dest)
+            if len(self._states) > self.max_size:
+                self._states.popitem(last=False)
+
+        return True
+
+    def update_many(self, telegrams):
+        update = self.update
+        for telegram in telegrams:
+            update(telegram)
+
+    def get(self, address, default=None, now=None):
+        """
+        Returns the `GroupState` of `address` (a `KnxAddress`, `'2/3/4'` or raw 16 bit value),
+        or `default` if it is unknown or expired. `now` defaults to the current time.
+        """
+        address = _group_address(address)
+        state = self._states.get(address)
+        if state is None:
+            return default
+
+        if self.ttl is not None and (now if now is not None else datetime.now()) - state.timestamp > self.ttl:
+            del self._states[address]
+            return default
+
+        if self.max_size is not None:
+            self._states.move_to_end(address)
+
+        return state
+
+    def value(self, address, default=None, now=None):
+        """
+        Returns the last value of `address`, or `default` if it is unknown or expired
+        """
+        state = self.get(address, now=now)
+        return state.value if state is not None else default
+
+    def expire(self, now=None):
+        """
+        Removes all expired states. Returns the number of removed states.
+        """
+        if self.ttl is None:
+            return 0
+
+        deadline = (now if now is not None else datetime.now()) - self.ttl
+        expired = [address for address, state in self._states.items() if state.timestamp < deadline]
+        for address in expired:
+            del self._states[address]
+
+        return len(expired)
+
+    def clear(self):
+        self._states.clear()
+
+    def __getitem__(self, address):
+        state = self.get(address)
+        if state is None:
+            raise KeyError(address)
+        return state
+
+    def __contains__(self, address):
+        return self.get(address) is not None
+
+    def __len__(self):
+        return len(self._states)
+
+    def __iter__(self):
+        return iter(list(self._states))
+
+
+def _group_address(address):
+    if isinstance(address, KnxAddress):
+        return address
+    elif isinstance(address, str):
+        return KnxAddress(address, group=True)
+    else:
+        return KnxAddress.from_int(int(address), True)
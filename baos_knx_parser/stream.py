@@ -0,0 +1,148 @@
+"""
+Decoding of live byte streams, e.g. from a BAOS gateway over TCP.
+
+`KnxFrameDecoder` cuts complete cEMI frames out of a byte stream, using the lengths in the frame headers.
+On top of it, `read_telegrams` decodes the frames of an `asyncio.StreamReader` and `KnxStreamProtocol`
+is an `asyncio.Protocol`, both are async iterators of telegrams.
+Every connection only needs a coroutine or a protocol instance, so one event loop can monitor many lines at once.
+"""
+import asyncio
+from collections import deque
+
+from .parser import frame_length, parse_knx_telegram
+
+DEFAULT_READ_SIZE = 4096
+DEFAULT_QUEUE_SIZE = 1024
+
+
+class KnxFrameDecoder(object):
+    """
+    Reassembles cEMI frames from chunks of a byte stream
+    """
+
+    def __init__(self):
+        self._buffer = bytearray()
+
+    def feed(self, data):
+        """
+        Appends `data` to the stream and returns all frames which are complete now
+        """
+        buffer = self._buffer
+        buffer += data
+
+        frames = []
+        offset = 0
+        while True:
+            length = frame_length(buffer, offset)
+            if length is None or offset + length > len(buffer):
+                break
+
+            frames.append(bytes(buffer[offset:offset + length]))
+            offset += length
+
+        del buffer[:offset]
+        return frames
+
+    @property
+    def pending(self):
+        """
+        Number of buffered bytes, which do not form a complete frame yet
+        """
+        return len(self._buffer)
+
+
+async def read_telegrams(reader, read_size=DEFAULT_READ_SIZE):
+    """
+    Async generator yielding the telegrams read from an `asyncio.StreamReader`.
+    The reader is only read when the next telegram is requested, so a slow consumer applies backpressure.
+    """
+    decoder = KnxFrameDecoder()
+    while True:
+        data = await reader.read(read_size)
+        if not data:
+            break
+
+        for frame in decoder.feed(data):
+            yield parse_knx_telegram(frame)
+
+
+async def open_telegram_stream(host, port, read_size=DEFAULT_READ_SIZE):
+    """
+    Connects to `host`:`port` and yields the received telegrams
+    """
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        async for telegram in read_telegrams(reader, read_size):
+            yield telegram
+    finally:
+        writer.close()
+
+
+class KnxStreamProtocol(asyncio.Protocol):
+    """
+    Protocol decoding the received frames as they arrive. Iterate over it asynchronously to get the telegrams.
+
+    If more than `queue_size` telegrams are waiting to be consumed, reading from the transport is paused
+    until half of them are consumed.
+    """
+
+    def __init__(self, queue_size=DEFAULT_QUEUE_SIZE):
+        self._decoder = KnxFrameDecoder()
+        self._queue = deque()
+        self._queue_size = queue_size
+        self._transport = None
+        self._paused = False
+        self._closed = False
+        self._exception = None
+        self._waiter = None
+
+    def connection_made(self, transport):
+        self._transport = transport
+
+    def data_received(self, data):
+        try:
+            for frame in self._decoder.feed(data):
+                self._queue.append(parse_knx_telegram(frame))
+        except Exception as e:
+            # the stream can not be resynchronized after a broken frame
+            self._exception = e
+            self._transport.close()
+
+        if len(self._queue) >= self._queue_size and not self._paused:
+            self._paused = True
+            self._transport.pause_reading()
+
+        self._wakeup()
+
+    def connection_lost(self, exc):
+        self._closed = True
+        if exc is not None and self._exception is None:
+            self._exception = exc
+        self._wakeup()
+
+    def _wakeup(self):
+        if self._waiter is not None and not self._waiter.done():
+            self._waiter.set_result(None)
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        while not self._queue:
+            if self._exception is not None:
+                raise self._exception
+            if self._closed:
+                raise StopAsyncIteration
+
+            self._waiter = asyncio.get_running_loop().create_future()
+            try:
+                await self._waiter
+            finally:
+                self._waiter = None
+
+        telegram = self._queue.popleft()
+        if self._paused and len(self._queue) <= self._queue_size // 2:
+            self._paused = False
+            self._transport.resume_reading()
+
+        return telegram
@@ -1,3 +1,5 @@
+from struct import Struct
+
 import bitstruct
 
 STD_U16 = bitstruct.compile('>u16')
@@ -20,3 +22,7 @@ KNX_NPCI = bitstruct.compile('>b1u3u4')
 KNX_PACKET_NUMBER = bitstruct.compile('>p2u4p2')
 
 KNX_ACK = STD_U8
+
+# byte aligned headers, packed with the standard library struct module
+CEMI_DATA_IND_HEADER = Struct('>BBBBHHB')  # msg code, add len, CTRL, CTRLE, src, dest, length
+CEMI_BUSMON_ACK = Struct('>BBB')  # msg code, add len, acknowledgement
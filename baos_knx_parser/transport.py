@@ -0,0 +1,262 @@
+"""
+Tracking of connection oriented transport layer sessions.
+
+Point to point connections (e.g. used for programming and property access) are opened with T_CONNECT,
+carry numbered data TPDUs, which are confirmed with T_ACK or rejected with T_NAK, and are closed with
+T_DISCONNECT. `TransportTracker` follows these sessions in a stream of telegrams: it detects gaps in the
+sequence numbers, transport layer retransmissions and measures the time until data is acknowledged.
+
+Sessions are keyed by the pair of their individual addresses, regardless of the direction. Closed, idle
+and evicted sessions are handed out as `TransportSession` objects.
+"""
+from collections import OrderedDict, deque
+from datetime import timedelta
+
+from .instrumentation import Histogram
+from .knx import KnxAddress
+
+DEFAULT_TIMEOUT = timedelta(seconds=6)  # the connection timeout of the KNX transport layer
+DEFAULT_MAX_SESSIONS = 1024
+DEFAULT_MAX_CLOSED = 1000
+
+# control TPDUs, see struct.KNX_TPCI
+T_CONNECT = 0x80
+T_DISCONNECT = 0x81
+T_ACK = 0xC2
+T_NAK = 0xC3
+
+# why a session ended
+DISCONNECTED = 'disconnected'
+RECONNECTED = 'reconnected'
+TIMED_OUT = 'timed_out'
+EVICTED = 'evicted'
+FLUSHED = 'flushed'
+
+
+class TransportSession(object):
+    """
+    State and statistics of one connection. `client` is the device sending T_CONNECT, or the first sender
+    seen if the capture started within the connection.
+    """
+
+    def __init__(self, client, server, opened, connected=True):
+        self.client = client
+        self.server = server
+        self.connected = connected  # False, if no T_CONNECT was seen
+        self.opened = opened  # ns since the epoch
+        self.last = opened
+        self.closed = None
+        self.reason = None
+
+        self.telegrams = 0
+        self.data_telegrams = 0
+        self.bytes = 0
+        self.acks = 0
+        self.naks = 0
+        self.gaps = 0  # number of missing sequence numbers
+        self.retransmissions = 0
+        self.latency = Histogram()  # ns from numbered data to its T_ACK
+
+        self._expected = {}  # sender -> next sequence number
+        self._pending = {}  # (sender, sequence number) -> ns, data waiting for its T_ACK
+
+    @property
+    def duration(self):
+        """
+        Duration in seconds from the first to the last telegram of the session
+        """
+        return (self.last - self.opened) / 1e9
+
+    @property
+    def throughput(self):
+        """
+        Payload bytes of the numbered data per second
+        """
+        duration = self.duration
+        return self.bytes / duration if duration else 0.0
+
+    def snapshot(self):
+        return {
+            'client': str(self.client),
+            'server': str(self.server),
+            'connected': self.connected,
+            'opened': self.opened,
+            'closed': self.closed,
+            'reason': self.reason,
+            'duration': self.duration,
+            'telegrams': self.telegrams,
+            'data_telegrams': self.data_telegrams,
+            'bytes': self.bytes,
+            'throughput': self.throughput,
+            'acks': self.acks,
+            'naks': self.naks,
+            'gaps': self.gaps,
+            'retransmissions': self.retransmissions,
+            'unacknowledged': len(self._pending),
+            'latency': self.latency.snapshot(),
+        }
+
+    def __repr__(self):
+        return '<TransportSession {} <-> {} telegrams={} gaps={} retransmissions={} reason={}>'.format(
+            self.client, self.server, self.telegrams, self.gaps, self.retransmissions, self.reason,
+        )
+
+
+class TransportTracker(object):
+    """
+    Follows transport layer sessions in a stream of telegrams with increasing timestamps.
+
+    At most `max_sessions` sessions are kept open, the least recently active one is evicted on overflow.
+    Sessions without a telegram for `timeout` (a `timedelta`) are closed as timed out.
+    Every ended session is passed to `on_close`, if given, and kept in `closed` (the last `max_closed`).
+    """
+
+    def __init__(self, timeout=DEFAULT_TIMEOUT, max_sessions=DEFAULT_MAX_SESSIONS, max_closed=DEFAULT_MAX_CLOSED,
+                 on_close=None):
+        self.timeout_ns = timeout // timedelta(microseconds=1) * 1000
+        self.max_sessions = max_sessions
+        self.on_close = on_close
+        self.sessions = OrderedDict()  # (lower, higher address) -> TransportSession, least recently active first
+        self.closed = deque(maxlen=max_closed)
+        self.telegrams = 0
+        self.repeats = 0
+        self.orphans = 0  # acknowledgements and disconnects without an open session
+
+    def _close(self, key, reason, now):
+        session = self.sessions.pop(key)
+        session.closed = now
+        session.reason = reason
+        self.closed.append(session)
+        if self.on_close is not None:
+            self.on_close(session)
+
+    def expire(self, now):
+        """
+        Closes all sessions idle since before `now` - timeout (ns since the epoch)
+        """
+        sessions = self.sessions
+        deadline = now - self.timeout_ns
+        while sessions:
+            key, session = next(iter(sessions.items()))
+            if session.last >= deadline:
+                break
+            self._close(key, TIMED_OUT, session.last + self.timeout_ns)
+
+    def _open(self, key, client, server, now, connected):
+        sessions = self.sessions
+        if len(sessions) >= self.max_sessions:
+            self._close(next(iter(sessions)), EVICTED, now)
+        session = sessions[key] = TransportSession(client, server, now, connected)
+        return session
+
+    def update(self, telegram):
+        """
+        Feeds one telegram, everything but point to point telegrams is ignored
+        """
+        dest = getattr(telegram, 'dest', None)
+        if dest is None or dest.group or not telegram.payload:
+            # acknowledgement frames and group communication
+            return
+
+        now = telegram.timestamp_ns
+        self.expire(now)
+        if telegram.repeat:
+            # link layer repetitions carry the same TPDU again
+            self.repeats += 1
+            return
+
+        self.telegrams += 1
+        src = int(telegram.src)
+        dest = int(dest)
+        key = (src, dest) if src < dest else (dest, src)
+        sessions = self.sessions
+        session = sessions.get(key)
+
+        tpdu = telegram.payload[0]
+        tpci = tpdu >> 6
+        if tpdu == T_CONNECT:
+            if session is not None:
+                self._close(key, RECONNECTED, now)
+            session = self._open(key, telegram.src, telegram.dest, now, True)
+        elif session is None:
+            if not tpci:
+                # connectionless point to point communication
+                return
+            if tpci != 0b01:
+                # only numbered data is enough to tell a connection is running
+                self.orphans += 1
+                return
+            session = self._open(key, telegram.src, telegram.dest, now, False)
+        else:
+            sessions.move_to_end(key)
+
+        session.telegrams += 1
+        session.last = now
+
+        if tpci == 0b01:
+            # numbered data
+            sequence = tpdu >> 2 & 0b1111
+            expected = session._expected.get(src)
+            if expected is not None and sequence != expected:
+                if sequence == (expected - 1) & 0b1111:
+                    # the previous TPDU again, its T_ACK was missing
+                    session.retransmissions += 1
+                    session._pending.setdefault((src, sequence), now)
+                    return
+                session.gaps += (sequence - expected) & 0b1111
+            session._expected[src] = (sequence + 1) & 0b1111
+            session._pending[src, sequence] = now
+            session.data_telegrams += 1
+            session.bytes += len(telegram.payload)
+        elif tpci == 0b11:
+            # numbered control, acknowledging data of the other side
+            sequence = tpdu >> 2 & 0b1111
+            if tpdu & 0b11 == T_ACK & 0b11:
+                session.acks += 1
+                sent = session._pending.pop((dest, sequence), None)
+                if sent is not None:
+                    session.latency.record(now - sent)
+            else:
+                session.naks += 1
+        elif tpdu == T_DISCONNECT:
+            self._close(key, DISCONNECTED, now)
+
+    def update_many(self, telegrams):
+        update = self.update
+        for telegram in telegrams:
+            update(telegram)
+
+    def flush(self, now=None):
+        """
+        Closes all open sessions, e.g. at the end of a capture. Sessions idle at `now` (ns since the epoch)
+        are closed as timed out.
+        """
+        if now is not None:
+            self.expire(now)
+        for key in list(self.sessions):
+            session = self.sessions[key]
+            self._close(key, FLUSHED, session.last if now is None else now)
+
+    def session(self, a, b):
+        """
+        Returns the open session between the individual addresses `a` and `b` (`KnxAddress` or str), or None
+        """
+        a = int(a if isinstance(a, KnxAddress) else KnxAddress(a))
+        b = int(b if isinstance(b, KnxAddress) else KnxAddress(b))
+        return self.sessions.get((a, b) if a < b else (b, a))
+
+    def snapshot(self):
+        return {
+            'telegrams': self.telegrams,
+            'repeats': self.repeats,
+            'orphans': self.orphans,
+            'open': [session.snapshot() for session in self.sessions.values()],
+            'closed': [session.snapshot() for session in self.closed],
+        }
+
+    def clear(self):
+        self.sessions.clear()
+        self.closed.clear()
+        self.telegrams = 0
+        self.repeats = 0
+        self.orphans = 0
@@ -0,0 +1,74 @@
+"""
+Synthetic cEMI frames for the benchmarks.
+
+All generators are deterministic for a given seed, so runs can be compared with each other.
+"""
+import random
+
+from baos_knx_parser.const import APCI, TelegramAcknowledgement
+from baos_knx_parser.parser import PAYLOAD_DECODERS
+
+
+def data_ind(src, dest, tpdu, group=True, ctrl=0xBC, hop_count=6, add_info=b''):
+    # L_Data.ind, the length field counts the payload behind TPCI/APCI
+    ctrle = group << 7 | hop_count << 4
+    return bytes((0x29, len(add_info))) + add_info + bytes((ctrl, ctrle)) + src.to_bytes(2, 'big') \
+        + dest.to_bytes(2, 'big') + bytes((len(tpdu) - 2, )) + tpdu
+
+
+def busmon_ack(acknowledgement=TelegramAcknowledgement.ACK):
+    return bytes((0x2B, 0, int(acknowledgement)))
+
+
+def tpdu(apci, data=b'', tpci=0, sequence_number=0):
+    return (tpci << 14 | sequence_number << 10 | int(apci)).to_bytes(2, 'big') + data
+
+
+def group_writes_short(count, seed=0):
+    rnd = random.Random(seed)
+    return [data_ind(rnd.getrandbits(16), rnd.getrandbits(16), tpdu(int(APCI.A_GROUP_VALUE_WRITE) | rnd.getrandbits(6)))
+            for _ in range(count)]
+
+
+def group_writes_long(count, seed=0):
+    rnd = random.Random(seed)
+    return [data_ind(rnd.getrandbits(16), rnd.getrandbits(16),
+                     tpdu(APCI.A_GROUP_VALUE_WRITE, bytes(rnd.getrandbits(8) for _ in range(rnd.randint(1, 14)))))
+            for _ in range(count)]
+
+
+def extended_frames(count, seed=0):
+    rnd = random.Random(seed)
+    return [data_ind(rnd.getrandbits(16), rnd.getrandbits(16),
+                     tpdu(APCI.A_GROUP_VALUE_WRITE, bytes(rnd.getrandbits(8) for _ in range(rnd.randint(15, 200)))),
+                     ctrl=0x3C)
+            for _ in range(count)]
+
+
+def busmon_acks(count, seed=0):
+    rnd = random.Random(seed)
+    acknowledgements = list(TelegramAcknowledgement._members.values())
+    return [busmon_ack(rnd.choice(acknowledgements)) for _ in range(count)]
+
+
+def all_apcis(count, seed=0):
+    """
+    Frames for every APCI with a payload_data decoder, sent point to point with 12 data bytes
+    """
+    rnd = random.Random(seed)
+    apcis = sorted(PAYLOAD_DECODERS, key=int)
+    frames = []
+    for i in range(count):
+        apci = apcis[i % len(apcis)]
+        data = bytes(rnd.getrandbits(8) for _ in range(12))
+        frames.append(data_ind(rnd.getrandbits(16), rnd.getrandbits(16), tpdu(apci, data), group=False))
+    return frames
+
+
+WORKLOADS = {
+    'group_write_short': group_writes_short,
+    'group_write_long': group_writes_long,
+    'extended': extended_frames,
+    'busmon_ack': busmon_acks,
+    'all_apci': all_apcis,
+}
@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+"""
+Benchmarks for the parser, enums, addresses and the serializer.
+
+    python benchmarks/run.py --output results.json
+    python benchmarks/run.py --baseline results.json
+
+Run it from the repository root with the package installed, or with `PYTHONPATH=.` set.
+Every benchmark reports frames (or operations) per second, the memory blocks and bytes per frame still
+allocated after the run (retained, e.g. by the returned telegrams) and the peak of the traced memory
+per frame while running, both measured with tracemalloc. Temporary allocations freed during the run
+are not counted as retained.
+The results are written as JSON. With `--baseline` the results are compared to a previous run
+and the script exits with 1 if a benchmark got slower than the given tolerance.
+"""
+import argparse
+import json
+import platform
+import random
+import sys
+import time
+import tracemalloc
+
+import baos_knx_parser as knx
+from baos_knx_parser.const import APCI, TelegramType, TelegramPriority
+from baos_knx_parser.constructor import serialize_many
+
+from generator import WORKLOADS
+
+
+def measure(func, items, repeat=5):
+    """
+    Calls `func(items)` `repeat` times and returns the best rate in items per second,
+    plus the blocks and bytes per item which are still allocated after one call and the peak of the
+    traced memory per item during that call.
+    """
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(items)
+        duration = time.perf_counter() - start
+        best = duration if best is None else min(best, duration)
+
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    tracemalloc.reset_peak()
+    start, _ = tracemalloc.get_traced_memory()
+    result = func(items)
+    _, peak = tracemalloc.get_traced_memory()
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+
+    stats = after.compare_to(before, 'filename')
+    blocks = sum(stat.count_diff for stat in stats)
+    size = sum(stat.size_diff for stat in stats)
+    del result
+
+    return {
+        'frames_per_second': len(items) / best if best else float('inf'),
+        'retained_blocks_per_frame': blocks / len(items),
+        'retained_bytes_per_frame': size / len(items),
+        'peak_bytes_per_frame': (peak - start) / len(items),
+    }
+
+
+def parse_each(frames):
+    return [knx.parse_knx_telegram(frame) for frame in frames]
+
+
+def parse_batch(frames):
+    return list(knx.parse_knx_telegrams(frames))
+
+
+def run(count):
+    results = {}
+
+    for name, workload in sorted(WORKLOADS.items()):
+        frames = workload(count)
+        results['parse_knx_telegram.' + name] = measure(parse_each, frames)
+        results['parse_knx_telegrams.' + name] = measure(parse_batch, frames)
+
+        try:
+            from baos_knx_parser.columnar import parse_knx_columns
+        except ImportError:
+            pass
+        else:
+            results['parse_knx_columns.' + name] = measure(parse_knx_columns, frames)
+
+        telegrams = parse_batch(frames)
+        results['to_binary.' + name] = measure(lambda items: [telegram.to_binary() for telegram in items], telegrams)
+        results['serialize_many.' + name] = measure(serialize_many, telegrams)
+
+    rnd = random.Random(0)
+    apci_codes = [rnd.getrandbits(10) for _ in range(count)]
+    apci_codes = [code for code in apci_codes if APCI._value_table[code] is not None]
+    results['BitmaskEnum.APCI'] = measure(lambda items: [APCI(code) for code in items], apci_codes)
+    results['BitmaskEnum.TelegramType'] = measure(lambda items: [TelegramType(code) for code in items],
+                                                  [rnd.getrandbits(2) for _ in range(count)])
+    results['BitmaskEnum.TelegramPriority'] = measure(lambda items: [TelegramPriority(code) for code in items],
+                                                      [rnd.getrandbits(2) for _ in range(count)])
+
+    addresses = [rnd.getrandbits(16) for _ in range(count)]
+    results['KnxAddress.from_int'] = measure(lambda items: [knx.KnxAddress.from_int(value) for value in items], addresses)
+    strings = [str(knx.KnxAddress.from_int(value, True)) for value in addresses]
+    results['KnxAddress.str'] = measure(lambda items: [knx.KnxAddress(value, group=True) for value in items], strings)
+    objects = [knx.KnxAddress.from_int(value) for value in addresses]
+    results['KnxAddress.__int__'] = measure(lambda items: [int(address) for address in items], objects)
+
+    return results
+
+
+def compare(results, baseline, tolerance):
+    regressions = []
+    for name, result in sorted(results.items()):
+        if name not in baseline:
+            continue
+
+        old = baseline[name]['frames_per_second']
+        new = result['frames_per_second']
+        change = (new - old) / old if old else 0.0
+        print("{name:50} {old:14.0f} -> {new:14.0f} ({change:+.1%})".format(name=name, old=old, new=new, change=change))
+        if change < -tolerance:
+            regressions.append(name)
+
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--count', type=int, default=10000, help="frames per benchmark")
+    parser.add_argument('--output', help="write the results as JSON to this file")
+    parser.add_argument('--baseline', help="compare the results with this JSON file")
+    parser.add_argument('--tolerance', type=float, default=0.1, help="allowed slow down, relative to the baseline")
+    args = parser.parse_args()
+
+    results = run(args.count)
+    report = {
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'count': args.count,
+        'results': results,
+    }
+
+    if args.output:
+        with open(args.output, 'w') as output:
+            json.dump(report, output, indent=2, sort_keys=True)
+    else:
+        json.dump(report, sys.stdout, indent=2, sort_keys=True)
+        print()
+
+    if args.baseline:
+        with open(args.baseline) as baseline:
+            regressions = compare(results, json.load(baseline)['results'], args.tolerance)
+
+        if regressions:
+            print("Slower than the baseline: " + ", ".join(regressions))
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -1,9 +1,5 @@
-import csv
-import binascii
-from datetime import datetime
-from pprint import pprint
-
 import baos_knx_parser as knx
+from baos_knx_parser.eiblog import iter_eiblog_chunks
 
 import numpy as np
 import pandas as pd
@@ -41,10 +37,8 @@ def telegram2vector(telegram):
 
 
 def read_telegramlog(file):
-    with open(file) as tsv:
-        for row in csv.reader(tsv, delimiter='\t'):
-            timestamp = datetime.strptime(' '.join(row[0:2]), '%H:%M:%S %Y-%m-%d')
-            telegram = knx.parse_knx_telegram(bytes.fromhex(row[5]), timestamp)
+    for timestamps, buffer, offsets in iter_eiblog_chunks(file):
+        for telegram in knx.parse_knx_stream(buffer, offsets, timestamps):
             yield telegram2vector(telegram)
 
 
@@ -0,0 +1,23 @@
+from baos_knx_parser.eiblog import ingest_eiblog, ColumnSink
+
+import pandas as pd
+
+"""
+This example parses the `eiblog.txt` file like `parse_eiblog.py`, but decodes all
+BAOS KNX packets at once into NumPy columns. No telegram object is created per packet,
+so this is a lot faster than the object based example.
+
+----
+
+This example requires the additional libraries pandas and numpy
+"""
+
+
+DUMP_FILE = 'eiblog.txt'
+
+
+columns, buffer = ingest_eiblog(DUMP_FILE, ColumnSink(), columnar=True).result()
+telegram_df = pd.DataFrame(columns)
+
+print(telegram_df.to_string())
+print(telegram_df['dest'].value_counts().head(10))
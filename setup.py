@@ -11,5 +11,8 @@ setup(name='BaosKnxParser',
       packages=['baos_knx_parser', ],
       install_requires=[
           'bitstruct>=3.5,<3.6',
-      ]
+      ],
+      extras_require={
+          'columnar': ['numpy'],
+      },
       )